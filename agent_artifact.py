@@ -0,0 +1,106 @@
+import hashlib
+import json
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import List, Dict, Any, Optional
+
+from model_setup import MODEL_NAME, MODEL_PROVIDER
+
+
+ARTIFACT_FORMAT_VERSION = 1
+
+
+def compute_content_hash(artifact: Dict[str, Any]) -> str:
+    """
+    Computes the SHA-256 hash of an artifact's content.
+
+    The hash covers every field except `content_hash` itself and `created_at`,
+    so exporting the same training result twice gives the same hash.
+
+    Args:
+        artifact (Dict[str, Any]): The artifact.
+
+    Returns:
+        str: The hex digest.
+    """
+    content = {key: value for key, value in artifact.items() if key not in ("content_hash", "created_at")}
+    canonical = json.dumps(content, sort_keys=True, ensure_ascii=False, separators=(",", ":"))
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+def _criterion_scores(score_matrix) -> Dict[str, List[Optional[float]]]:
+    """Returns the per-criterion mean scores per cycle, with unscored cycles as None."""
+    if score_matrix is None:
+        return {}
+    return {
+        name: [None if value != value else round(value, 2) for value in history]
+        for name, history in score_matrix.criterion_history().items()
+    }
+
+
+def build_artifact(results: Dict[str, Any], custom_criteria: str = "", name: str = "trained-agent") -> Dict[str, Any]:
+    """
+    Bundles a training result into a versioned, self-describing agent artifact.
+
+    Args:
+        results (Dict[str, Any]): The training results, as stored in `st.session_state.training_results`.
+        custom_criteria (str, optional): The custom criteria used during training. Defaults to "".
+        name (str, optional): Name the serving entry point exposes the agent under. Defaults to "trained-agent".
+
+    Returns:
+        Dict[str, Any]: The artifact, including its `content_hash`.
+    """
+    # Imported here so that loading artifacts for serving does not import Streamlit
+    from functions import get_criteria
+
+    score_matrix = results.get('score_matrix')
+    artifact = {
+        'format_version': ARTIFACT_FORMAT_VERSION,
+        'name': name,
+        'created_at': datetime.now(timezone.utc).isoformat(),
+        'prompt': results['final_prompt'],
+        'model': {'provider': MODEL_PROVIDER, 'name': MODEL_NAME},
+        'criteria': get_criteria(custom_criteria),
+        'custom_criteria': custom_criteria,
+        'scores': list(results['scores']),
+        'criterion_scores': _criterion_scores(score_matrix),
+        'num_cycles': results['num_cycles'],
+    }
+    artifact['content_hash'] = compute_content_hash(artifact)
+    return artifact
+
+
+def export_artifact(artifact: Dict[str, Any], path: Path) -> Path:
+    """
+    Writes an artifact to a JSON file.
+
+    Args:
+        artifact (Dict[str, Any]): The artifact from `build_artifact`.
+        path (Path): Destination file.
+
+    Returns:
+        Path: The path written to.
+    """
+    path.write_text(json.dumps(artifact, ensure_ascii=False, indent=2, allow_nan=False), encoding="utf-8")
+    return path
+
+
+def load_artifact(path: Path) -> Dict[str, Any]:
+    """
+    Loads an artifact and checks its format version and content hash.
+
+    Args:
+        path (Path): The artifact file.
+
+    Returns:
+        Dict[str, Any]: The artifact.
+
+    Raises:
+        ValueError: If the format version is unsupported or the content does not match its hash.
+    """
+    artifact = json.loads(path.read_text(encoding="utf-8"))
+    if artifact.get('format_version') != ARTIFACT_FORMAT_VERSION:
+        raise ValueError(f"Unsupported artifact format version: {artifact.get('format_version')}")
+    if artifact.get('content_hash') != compute_content_hash(artifact):
+        raise ValueError(f"Artifact {path} does not match its content hash")
+    return artifact
@@ -0,0 +1,93 @@
+"""
+Benchmark for the local JSON repair of evaluator, rewriter and judge outputs.
+
+Replays the malformed model outputs in bad_outputs.json through strict
+parsing (what a plain `json.loads` + schema check accepts) and through
+`parse_structured_output`. Every output the strict path rejects costs a
+retry round-trip. The report shows how many of those the repair avoids and
+compares the local repair time with the round-trip cost.
+
+The samples are hand-written, not captured from real model runs, with
+one or two per failure mode (think blocks, fences, prose, trailing commas,
+quotes, truncation, schema violations). The results therefore show which
+failure modes the repair covers, not how often they occur in production.
+
+Usage:
+    python benchmarks/output_repair_benchmark.py [--retry-latency 3.0] [--repeat 200]
+"""
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from pydantic import ValidationError
+from pydantic_ai import ModelRetry
+
+from functions import EvaluatorOutput, RewriterOutput, PairwiseVerdict
+from structured_output import OutputStats, parse_structured_output
+
+OUTPUT_TYPES = {"evaluator": EvaluatorOutput, "rewriter": RewriterOutput, "judge": PairwiseVerdict}
+BAD_OUTPUTS_FILE = Path(__file__).resolve().parent / "bad_outputs.json"
+
+
+def strict_parse(text: str, output_cls) -> bool:
+    """Returns whether the output parses and validates without any repair."""
+    try:
+        output_cls.model_validate(json.loads(text))
+        return True
+    except (ValueError, ValidationError):
+        return False
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--retry-latency", type=float, default=3.0, help="Seconds one retry round-trip costs")
+    parser.add_argument("--repeat", type=int, default=200, help="Repetitions for timing the repair")
+    args = parser.parse_args()
+
+    samples = json.loads(BAD_OUTPUTS_FILE.read_text(encoding="utf-8"))
+    stats = {name: OutputStats() for name in OUTPUT_TYPES}
+    strict_failures = {name: 0 for name in OUTPUT_TYPES}
+    repair_seconds = 0.0
+
+    print(f"{'agent':<10} {'kind':<32} {'strict':>7} {'repair':>7}")
+    for sample in samples:
+        output_cls = OUTPUT_TYPES[sample['agent']]
+        strict_ok = strict_parse(sample['output'], output_cls)
+        strict_failures[sample['agent']] += not strict_ok
+
+        try:
+            parse_structured_output(sample['output'], output_cls, stats[sample['agent']])
+            repaired_ok = True
+        except ModelRetry:
+            repaired_ok = False
+
+        start = time.perf_counter()
+        for _ in range(args.repeat):
+            try:
+                parse_structured_output(sample['output'], output_cls, OutputStats())
+            except ModelRetry:
+                pass
+        repair_seconds += (time.perf_counter() - start) / args.repeat
+
+        print(f"{sample['agent']:<10} {sample['kind']:<32} {'ok' if strict_ok else 'retry':>7} {'ok' if repaired_ok else 'retry':>7}")
+
+    print(f"\n{'agent':<10} {'strict retry rate':>18} {'repaired retry rate':>20}")
+    for name, agent_stats in stats.items():
+        if agent_stats.attempts:
+            print(f"{name:<10} {strict_failures[name] / agent_stats.attempts:>18.0%} {agent_stats.retry_rate:>20.0%}")
+
+    total_strict = sum(strict_failures.values())
+    total_retries = sum(agent_stats.failed for agent_stats in stats.values())
+    avoided = total_strict - total_retries
+    print(f"\nRetries avoided: {avoided}/{total_strict} "
+          f"(~{avoided * args.retry_latency:.1f}s of round-trips at {args.retry_latency:.1f}s each)")
+    print(f"Local parsing cost: {repair_seconds * 1e3:.2f}ms for all {len(samples)} outputs")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
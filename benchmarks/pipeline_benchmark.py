@@ -0,0 +1,48 @@
+"""
+Benchmark for serial vs. speculative pipelined training.
+
+Runs `run_automated_training` in both modes against a stub model. The stub
+sleeps for a fixed latency per call and returns seeded random evaluator
+scores, so some candidates are rejected by the backtrack rule. It reports
+throughput and the rate of support calls thrown away by rejected speculation.
+
+Usage:
+    python benchmarks/pipeline_benchmark.py [--cycles 6] [--queries 3] [--latency 0.2]
+"""
+import argparse
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from pipelined_training import run_automated_training
+from prompts import customer_support_prompt
+from stub_model import create_stub_model
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--cycles", type=int, default=6, help="Number of training cycles")
+    parser.add_argument("--queries", type=int, default=3, help="Queries per cycle")
+    parser.add_argument("--latency", type=float, default=0.2, help="Stub model latency per call in seconds")
+    parser.add_argument("--seed", type=int, default=7, help="Seed for the stub evaluator scores")
+    args = parser.parse_args()
+
+    query_batches = [[f"Query {cycle}.{i}: my wifi is down" for i in range(args.queries)] for cycle in range(args.cycles)]
+
+    print(f"{'mode':<10} {'seconds':>8} {'cycles/s':>9} {'queries/s':>10} {'wasted':>7} {'rejected':>9}")
+    for pipelined in (False, True):
+        model = create_stub_model(args.latency, args.seed)
+        results = run_automated_training(model, customer_support_prompt, query_batches, pipelined=pipelined)
+        stats = results['stats']
+        mode = "pipelined" if pipelined else "serial"
+        print(
+            f"{mode:<10} {stats['elapsed_seconds']:>8.2f} {stats['cycles_per_second']:>9.2f} "
+            f"{stats['interactions_per_second']:>10.2f} {stats['wasted_call_rate']:>7.1%} "
+            f"{stats['rejected_cycles']:>4}/{stats['speculative_cycles']:<4}"
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,117 @@
+"""
+Load test for the artifact serving entry point.
+
+By default it starts an in-process `AgentServer` for an artifact built from
+the default prompt, backed by the offline stub model. It then sends
+`--requests` chat requests with `--concurrency` clients and reports requests
+per second and latency percentiles. Pass `--host`/`--port` to test an already
+running `serve.py` instead.
+
+Usage:
+    python benchmarks/serving_load_test.py [--requests 500] [--concurrency 50] [--stub-latency 0.05]
+"""
+import argparse
+import asyncio
+import json
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from agent_artifact import build_artifact, export_artifact, load_artifact
+from prompts import customer_support_prompt
+from serve import AgentServer
+from stub_model import create_stub_model
+
+MESSAGES = ["hi", "my wifi is down", "I was charged twice this month", "where is my order?", "cancel my subscription"]
+
+
+async def send_chat(host: str, port: int, message: str) -> float:
+    """Sends one chat request and returns its latency in seconds."""
+    start = time.perf_counter()
+    reader, writer = await asyncio.open_connection(host, port)
+    body = json.dumps({"message": message}).encode("utf-8")
+    writer.write(
+        f"POST /chat HTTP/1.1\r\nHost: {host}\r\nContent-Type: application/json\r\n"
+        f"Content-Length: {len(body)}\r\nConnection: close\r\n\r\n".encode("latin-1") + body
+    )
+    await writer.drain()
+    response = await reader.read()
+    writer.close()
+    if not response.startswith(b"HTTP/1.1 200"):
+        raise RuntimeError(response.split(b"\r\n", 1)[0].decode("latin-1"))
+    return time.perf_counter() - start
+
+
+def percentile(values: list, fraction: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+async def run_load(host: str, port: int, requests: int, concurrency: int) -> tuple[list, int, float]:
+    """Sends the requests from `concurrency` clients and returns (latencies, errors, elapsed)."""
+    queue = asyncio.Queue()
+    for i in range(requests):
+        queue.put_nowait(MESSAGES[i % len(MESSAGES)])
+    latencies, errors = [], 0
+
+    async def client():
+        nonlocal errors
+        while not queue.empty():
+            message = queue.get_nowait()
+            try:
+                latencies.append(await send_chat(host, port, message))
+            except Exception:
+                errors += 1
+
+    start = time.perf_counter()
+    await asyncio.gather(*[client() for _ in range(concurrency)])
+    return latencies, errors, time.perf_counter() - start
+
+
+async def main_async(args) -> int:
+    listener = None
+    host, port = args.host, args.port
+    if port is None:
+        results = {'final_prompt': customer_support_prompt, 'scores': [], 'num_cycles': 0}
+        with tempfile.TemporaryDirectory() as directory:
+            path = export_artifact(build_artifact(results, name="load-test"), Path(directory) / "agent.json")
+            artifact = load_artifact(path)
+        stub = create_stub_model(latency=args.stub_latency)
+        server = AgentServer([artifact], lambda _: stub, max_concurrency=args.concurrency)
+        listener = await server.start(host, 0)
+        port = listener.sockets[0].getsockname()[1]
+
+    try:
+        latencies, errors, elapsed = await run_load(host, port, args.requests, args.concurrency)
+    finally:
+        if listener is not None:
+            listener.close()
+            await listener.wait_closed()
+
+    if not latencies:
+        print(f"❌ All {errors} requests failed")
+        return 1
+    print(f"Requests: {len(latencies)} ok, {errors} failed in {elapsed:.2f}s with {args.concurrency} clients")
+    print(f"Throughput: {len(latencies) / elapsed:.1f} requests/s")
+    print(f"Latency: p50 {statistics.median(latencies) * 1e3:.1f}ms, "
+          f"p99 {percentile(latencies, 0.99) * 1e3:.1f}ms, max {max(latencies) * 1e3:.1f}ms")
+    return 0 if not errors else 1
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=500, help="Total number of requests")
+    parser.add_argument("--concurrency", type=int, default=50, help="Number of concurrent clients")
+    parser.add_argument("--stub-latency", type=float, default=0.05, help="Seconds the stub model waits per call")
+    parser.add_argument("--host", default="127.0.0.1", help="Host of a running server")
+    parser.add_argument("--port", type=int, help="Port of a running server; omit to start one in-process")
+    args = parser.parse_args()
+    return asyncio.run(main_async(args))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,119 @@
+"""
+Startup benchmark for the Streamlit app.
+
+Profiles the import time of `main` with `python -X importtime` and measures
+how long the first page render takes in a fresh process, using Streamlit's
+AppTest harness. pydantic-ai and the Groq provider should not be imported
+until an agent is actually needed. Logfire is imported early by pydantic's
+plugin discovery, but it should not be configured before then.
+
+Usage:
+    python benchmarks/startup_benchmark.py [--runs 3] [--top 15]
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+# Target wall time for the first render of main.py in a cold process.
+FIRST_RENDER_TARGET_S = 1.5
+
+# Modules that must stay unloaded until the first agent is created. logfire is
+# not listed: it registers a pydantic plugin, so defining any BaseModel imports
+# it. Only `logfire.configure` is deferred.
+DEFERRED_MODULES = ["pydantic_ai", "groq"]
+
+FIRST_RENDER_SCRIPT = """
+import sys, time, json
+start = time.perf_counter()
+from streamlit.testing.v1 import AppTest
+app = AppTest.from_file("main.py", default_timeout=30)
+app.run()
+elapsed = time.perf_counter() - start
+loaded = [m for m in {deferred!r} if m in sys.modules]
+print(json.dumps({{"elapsed": elapsed, "exceptions": len(app.exception), "loaded": loaded}}))
+"""
+
+
+def profile_imports(top: int) -> list[tuple[int, str]]:
+    """
+    Runs `python -X importtime -c "import main"` and returns the slowest
+    imports by cumulative time.
+
+    Args:
+        top (int): Number of entries to return.
+
+    Returns:
+        list[tuple[int, str]]: (cumulative microseconds, module name) pairs.
+    """
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import main"],
+        cwd=ROOT, capture_output=True, text=True,
+    )
+    entries = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _self_us, cumulative_us, name = line[len("import time:"):].split("|", 2)
+        entries.append((int(cumulative_us), name.strip()))
+    entries.sort(reverse=True)
+    return entries[:top]
+
+
+def measure_first_render() -> dict:
+    """
+    Renders main.py once in a fresh interpreter and reports the elapsed time
+    and which deferred modules were imported along the way.
+
+    Returns:
+        dict: Keys `elapsed`, `exceptions` and `loaded`.
+    """
+    import json
+
+    env = dict(os.environ)
+    env.setdefault("GROQ_KEY", "benchmark-key")
+    result = subprocess.run(
+        [sys.executable, "-c", FIRST_RENDER_SCRIPT.format(deferred=DEFERRED_MODULES)],
+        cwd=ROOT, capture_output=True, text=True, env=env,
+    )
+    if result.returncode != 0:
+        raise RuntimeError(result.stderr)
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=3, help="Number of cold first-render runs")
+    parser.add_argument("--top", type=int, default=15, help="Number of slowest imports to show")
+    args = parser.parse_args()
+
+    print(f"Slowest imports for `import main` (top {args.top}):")
+    for cumulative_us, name in profile_imports(args.top):
+        print(f"  {cumulative_us / 1000:8.1f} ms  {name}")
+
+    timings = []
+    loaded = set()
+    for _ in range(args.runs):
+        run = measure_first_render()
+        if run["exceptions"]:
+            print("❌ First render raised an exception")
+            return 1
+        timings.append(run["elapsed"])
+        loaded.update(run["loaded"])
+
+    median = statistics.median(timings)
+    print(f"\nFirst render: median {median:.3f}s over {args.runs} runs (target {FIRST_RENDER_TARGET_S:.1f}s)")
+    if loaded:
+        print(f"❌ Deferred modules imported during first render: {', '.join(sorted(loaded))}")
+    else:
+        print("✅ No deferred modules imported during first render")
+
+    return 0 if median <= FIRST_RENDER_TARGET_S and not loaded else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,68 +1,115 @@
-import logfire
-import dotenv
-import os
-from pydantic_ai.agent import Agent
-from pydantic_ai.models.groq import GroqModel
-from pydantic_ai.providers.groq import GroqProvider
 from pydantic import BaseModel, Field
-from typing import List, Dict, Any, Tuple, Optional
-import streamlit as st
-
-from prompts import customer_support_prompt, evaluator_prompt, rewriter_prompt
+from typing import List, Dict, Any, Tuple, Optional, Literal, Annotated, TYPE_CHECKING
+
+from prompts import customer_support_prompt, evaluator_prompt, rewriter_prompt, pairwise_judge_prompt, standard_criteria
+from structured_output import create_output_parser
+from model_setup import (
+    MODEL_PROVIDER,
+    MODEL_NAME,
+    configure_instrumentation,
+    create_model,
+    create_customer_support_agent,
+    initialize_environment as _initialize_environment,
+)
 import json
 from datetime import datetime
 from pathlib import Path
 
+if TYPE_CHECKING:
+    # pydantic_ai and the Groq provider are slow to import, so they are only
+    # loaded at runtime the first time an agent or model is actually created.
+    from pydantic_ai.agent import Agent
+    from pydantic_ai.models.groq import GroqModel
+
+
+class InteractionScore(BaseModel):
+    interaction: int = Field(ge=1, description="1-based index of the interaction in the log")
+    criterion_scores: dict[str, Annotated[int, Field(ge=1, le=100)]] = Field(description="Score between 1 to 100 for each criterion, keyed by criterion name")
+
 
 class EvaluatorOutput(BaseModel):
-    improvement_instr: list[str] = Field("Improvement instructions from the agent")
-    score: int = Field("Score between 1 to 100 about how well the agent has performed according to the metrics")
+    improvement_instr: list[str] = Field(min_length=3, max_length=5, description="Improvement instructions from the agent")
+    score: int = Field(ge=1, le=100, description="Score between 1 to 100 about how well the agent has performed according to the metrics")
+    # Optional so an evaluation without the breakdown does not cost a retry; its cycle score still counts
+    interaction_scores: list[InteractionScore] = Field(default_factory=list, description="Per-criterion scores for each interaction")
 
 
 class RewriterOutput(BaseModel):
-    new_prompt: str = Field("updated system prompt")
-    improvements: list[str] = Field("What improvements where made.")
+    new_prompt: str = Field(min_length=1, description="updated system prompt")
+    improvements: list[str] = Field(min_length=1, description="What improvements where made.")
+
+
+class PairwiseVerdict(BaseModel):
+    winner: Literal["A", "B", "tie"] = Field(description="Which reply is better: A, B, or tie")
+    # Optional since only the winner is used
+    reason: str = Field(default="", description="One sentence explaining the decision")
 
 
 def initialize_environment() -> Tuple[str, str]:
     """
     Initializes environment variables by loading them from a .env file
-    and returns the necessary API keys. It also configures Logfire for monitoring.
+    and returns the necessary API keys, falling back to Streamlit secrets.
+
+    The keys are resolved once per process and cached; see
+    `model_setup.initialize_environment`.
 
     Returns:
         Tuple[str, str]: A tuple containing the GROQ API key and Logfire token.
     """
-    dotenv.load_dotenv()
-    groq_key = os.getenv("GROQ_KEY")
-    logfire_token = os.getenv("LOGFIRE_TOKEN")
+    def read_secrets() -> Tuple[str, str]:
+        # Imported here so headless tools that import this module do not load Streamlit
+        import streamlit as st
 
-    if not groq_key:
-        groq_key = st.secrets['GROQ_KEY']
-        logfire_token = st.secrets['LOGFIRE_TOKEN']
-    
-    if logfire_token:
-        logfire.configure(token=logfire_token)
-        logfire.instrument_pydantic_ai()
-    
-    return groq_key, logfire_token
+        return st.secrets['GROQ_KEY'], st.secrets['LOGFIRE_TOKEN']
 
+    return _initialize_environment(fallback=read_secrets)
 
-def create_model(groq_key: str) -> GroqModel:
+
+def parse_custom_criteria(custom_criteria: str) -> List[str]:
     """
-    Creates and returns a GroqModel instance for the AI agent.
+    Extracts criterion names from the free-text custom criteria.
+
+    Each criterion is one line of the form "Name: description" or
+    "Name – description". A leading list marker is dropped and the name is
+    the text before the first dash or colon, e.g.
+    "1. Brevity – Keep answers short" becomes "Brevity". Lines without a
+    separator are treated as continued descriptions, not as criteria.
 
     Args:
-        groq_key (str): The API key for the Groq service.
+        custom_criteria (str): The custom criteria entered by the user.
 
     Returns:
-        GroqModel: An instance of the GroqModel.
+        List[str]: The criterion names, in order and without duplicates.
     """
-    return GroqModel(
-        'qwen/qwen3-32b', provider=GroqProvider(api_key=groq_key)
-    )
+    names = []
+    for line in custom_criteria.splitlines():
+        line = line.strip().lstrip("-*•").strip()
+        head, _, rest = line.partition(". ")
+        if head.isdigit():
+            line = rest.strip()
+        positions = [line.find(separator) for separator in (" – ", " - ", ":") if separator in line]
+        if not positions:
+            continue
+        line = line[:min(positions)].strip()
+        if line and line not in names and line not in standard_criteria:
+            names.append(line)
+    return names
+
+
+def get_criteria(custom_criteria: str = "") -> List[str]:
+    """
+    Returns the full list of criterion names the evaluator scores against.
+
+    Args:
+        custom_criteria (str, optional): Additional criteria text. Defaults to "".
+
+    Returns:
+        List[str]: The standard criteria followed by any custom criteria.
+    """
+    return standard_criteria + parse_custom_criteria(custom_criteria)
 
 
-def create_agents(model: GroqModel, custom_criteria: str = "") -> Tuple[Agent, Agent]:
+def create_agents(model: "GroqModel", custom_criteria: str = "") -> Tuple["Agent", "Agent"]:
     """
     Creates and returns the evaluator and rewriter agents.
 
@@ -74,40 +121,53 @@ def create_agents(model: GroqModel, custom_criteria: str = "") -> Tuple[Agent, A
     Returns:
         Tuple[Agent, Agent]: A tuple containing the evaluator and rewriter agents.
     """
+    from pydantic_ai.agent import Agent
+
     evaluator_system_prompt = evaluator_prompt
     if custom_criteria:
         evaluator_system_prompt += f"\n\nEvaluation Criteria:\n{custom_criteria}"
+        custom_names = parse_custom_criteria(custom_criteria)
+        if custom_names:
+            evaluator_system_prompt += f"\n\nAdditional criterion names for `criterion_scores`: {', '.join(custom_names)}"
 
     evaluator_agent = Agent(
         system_prompt=evaluator_system_prompt,
         model=model,
-        output_type=EvaluatorOutput
+        output_type=create_output_parser(EvaluatorOutput, "evaluator")
     )
 
     rewriter_agent = Agent(
         system_prompt=rewriter_prompt,
-        output_type=RewriterOutput,
+        output_type=create_output_parser(RewriterOutput, "rewriter"),
         model=model
     )
     
     return evaluator_agent, rewriter_agent
 
 
-def create_customer_support_agent(model: GroqModel, system_prompt: str) -> Agent:
+def create_pairwise_judge(model: "GroqModel", custom_criteria: str = "") -> "Agent":
     """
-    Creates a customer support agent with a given system prompt.
+    Creates an agent that compares two replies to the same customer message.
+
+    It uses the same criteria as the evaluator agent, including any custom criteria.
 
     Args:
-        model (GroqModel): The language model for the agent.
-        system_prompt (str): The system prompt that defines the agent's behavior.
+        model (GroqModel): The language model to be used by the agent.
+        custom_criteria (str, optional): Additional criteria for the judge. Defaults to "".
 
     Returns:
-        Agent: An instance of the customer support agent.
+        Agent: The pairwise judge agent.
     """
+    from pydantic_ai.agent import Agent
+
+    judge_system_prompt = pairwise_judge_prompt
+    if custom_criteria:
+        judge_system_prompt += f"\n\nEvaluation Criteria:\n{custom_criteria}"
+
     return Agent(
+        system_prompt=judge_system_prompt,
         model=model,
-        system_prompt=system_prompt,
-        output_type=str,
+        output_type=create_output_parser(PairwiseVerdict, "judge")
     )
 
 
@@ -145,7 +205,7 @@ def log_interaction(log_file: Path, user_input: str, agent_output: str) -> None:
     log_file.write_text(json.dumps(data, ensure_ascii=False, indent=2))
 
 
-def evaluate_performance(evaluator_agent: Agent, log_content: str) -> EvaluatorOutput:
+def evaluate_performance(evaluator_agent: "Agent", log_content: str) -> EvaluatorOutput:
     """
     Evaluates the agent's performance based on the conversation log.
 
@@ -160,7 +220,8 @@ def evaluate_performance(evaluator_agent: Agent, log_content: str) -> EvaluatorO
     return response.output
 
 
-def rewrite_prompt(rewriter_agent: Agent, old_prompt: str, improvement_instructions: List[str]) -> RewriterOutput:
+def rewrite_prompt(rewriter_agent: "Agent", old_prompt: str, improvement_instructions: List[str],
+                   weakest_criteria: Optional[List[str]] = None) -> RewriterOutput:
     """
     Rewrites the system prompt based on improvement instructions.
 
@@ -168,6 +229,7 @@ def rewrite_prompt(rewriter_agent: Agent, old_prompt: str, improvement_instructi
         rewriter_agent (Agent): The agent responsible for rewriting the prompt.
         old_prompt (str): The original system prompt.
         improvement_instructions (List[str]): A list of instructions for improvement.
+        weakest_criteria (List[str], optional): Lowest scoring criteria to focus on. Defaults to None.
 
     Returns:
         RewriterOutput: An object containing the new prompt and a list of improvements.
@@ -176,6 +238,8 @@ def rewrite_prompt(rewriter_agent: Agent, old_prompt: str, improvement_instructi
     old_prompt: {old_prompt} \n\n
     improvement_instructions: {improvement_instructions}
     """
+    if weakest_criteria:
+        prompt_text += f"\n    weakest_criteria: {weakest_criteria}\n"
     response = rewriter_agent.run_sync(prompt_text)
     return response.output
 
@@ -205,7 +269,7 @@ def save_new_prompt(new_prompt: str, improvements: List[str]) -> None:
     json_file.write_text(json.dumps(existing, ensure_ascii=False, indent=2), encoding="utf-8")
 
 
-def run_customer_interaction(agent: Agent, user_queries: List[str]) -> List[Tuple[str, str]]:
+def run_customer_interaction(agent: "Agent", user_queries: List[str]) -> List[Tuple[str, str]]:
     """
     Runs a series of customer interactions and logs them.
 
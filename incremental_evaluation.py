@@ -0,0 +1,108 @@
+import json
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import List, Optional, TYPE_CHECKING
+
+from functions import EvaluatorOutput, InteractionScore
+
+if TYPE_CHECKING:
+    from pydantic_ai.agent import Agent
+
+
+# Shared by every session in the process so background evaluations cannot
+# multiply the number of concurrent LLM calls without bound.
+_executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix="incremental-eval")
+
+MIN_IMPROVEMENT_INSTRUCTIONS = 3
+MAX_IMPROVEMENT_INSTRUCTIONS = 5
+
+
+class IncrementalEvaluator:
+    """
+    Scores each interaction in the background as soon as it is logged, and
+    merges the per-interaction results into one `EvaluatorOutput` at the end
+    of the cycle without another LLM call.
+    """
+
+    def __init__(self, evaluator_agent: "Agent"):
+        """
+        Args:
+            evaluator_agent (Agent): The agent responsible for evaluation.
+        """
+        self.evaluator_agent = evaluator_agent
+        self._futures: List[Future] = []
+        self.failed = 0
+
+    def __len__(self) -> int:
+        return len(self._futures)
+
+    def submit(self, user_input: str, agent_output: str) -> None:
+        """
+        Starts evaluating a single interaction in the background.
+
+        Args:
+            user_input (str): The input provided by the user.
+            agent_output (str): The output generated by the agent.
+        """
+        log_content = json.dumps(
+            [{"user_input": user_input, "agent_output": agent_output}],
+            ensure_ascii=False, indent=2
+        )
+        self._futures.append(_executor.submit(self._evaluate, log_content))
+
+    def _evaluate(self, log_content: str) -> EvaluatorOutput:
+        return self.evaluator_agent.run_sync(log_content).output
+
+    def merge(self) -> Optional[EvaluatorOutput]:
+        """
+        Waits for the pending evaluations and merges them into one result.
+
+        The cycle score is the mean of the interaction scores. Improvement
+        instructions are taken round-robin: each interaction's first
+        instruction, then each one's second, and so on, skipping exact
+        duplicates, so feedback on every interaction is represented. The
+        per-criterion scores are renumbered to the interaction order.
+
+        If any background evaluation failed, nothing is merged: a score over
+        only the remaining interactions would feed the backtrack rule. The
+        number of failures is kept in `failed` so the caller can report it.
+
+        Returns:
+            Optional[EvaluatorOutput]: The merged evaluation, or None if any evaluation failed
+                                       or too few distinct instructions were raised.
+        """
+        results = []
+        self.failed = 0
+        for index, future in enumerate(self._futures, 1):
+            try:
+                results.append((index, future.result()))
+            except Exception:
+                self.failed += 1
+
+        if self.failed or not results:
+            return None
+
+        instructions = []
+        seen = set()
+        depth = max(len(evaluation.improvement_instr) for _, evaluation in results)
+        for position in range(depth):
+            for _, evaluation in results:
+                if position >= len(evaluation.improvement_instr):
+                    continue
+                instruction = evaluation.improvement_instr[position].strip()
+                if instruction.lower() not in seen:
+                    seen.add(instruction.lower())
+                    instructions.append(instruction)
+
+        interaction_scores = [
+            InteractionScore(interaction=index, criterion_scores=entry.criterion_scores)
+            for index, evaluation in results
+            for entry in evaluation.interaction_scores[:1]
+        ]
+
+        if len(instructions) < MIN_IMPROVEMENT_INSTRUCTIONS:
+            return None
+        return EvaluatorOutput(
+            improvement_instr=instructions[:MAX_IMPROVEMENT_INSTRUCTIONS],
+            score=round(sum(evaluation.score for _, evaluation in results) / len(results)),
+            interaction_scores=interaction_scores,
+        )
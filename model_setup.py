@@ -0,0 +1,123 @@
+import os
+import threading
+from typing import Callable, Tuple, Optional, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    # Only imported when a model or agent is created; see create_model.
+    from pydantic_ai.agent import Agent
+    from pydantic_ai.models.groq import GroqModel
+
+
+# Kept free of Streamlit so serve.py and the headless tools can import it
+# without loading the UI framework.
+
+MODEL_PROVIDER = "groq"
+MODEL_NAME = "qwen/qwen3-32b"
+
+_environment: Optional[Tuple[Optional[str], Optional[str]]] = None
+_instrumented = False
+_setup_lock = threading.Lock()
+
+
+def initialize_environment(
+    fallback: Optional[Callable[[], Tuple[str, str]]] = None
+) -> Tuple[Optional[str], Optional[str]]:
+    """
+    Loads environment variables from a .env file and returns the necessary API keys.
+
+    The keys are resolved once per process and cached, so calling this on
+    every Streamlit rerun or inside each handler is cheap. Logfire is not
+    configured here; see `configure_instrumentation`.
+
+    Args:
+        fallback (Callable, optional): Returns the keys when GROQ_KEY is not set in the
+                                       environment, e.g. from Streamlit secrets. Defaults to None.
+
+    Returns:
+        Tuple[Optional[str], Optional[str]]: The GROQ API key and Logfire token, or None for
+                                             a key that is not set.
+    """
+    global _environment
+    if _environment is not None:
+        return _environment
+
+    with _setup_lock:
+        if _environment is None:
+            import dotenv
+
+            dotenv.load_dotenv()
+            groq_key = os.getenv("GROQ_KEY")
+            logfire_token = os.getenv("LOGFIRE_TOKEN")
+
+            if not groq_key and fallback is not None:
+                groq_key, logfire_token = fallback()
+
+            _environment = (groq_key, logfire_token)
+
+    return _environment
+
+
+def configure_instrumentation() -> None:
+    """
+    Configures Logfire and instruments pydantic-ai, once per process.
+
+    This is deferred until the first model is created so that rendering the
+    UI does not pay for configuring Logfire.
+    """
+    global _instrumented
+    if _instrumented:
+        return
+
+    # Resolved before taking the lock, which initialize_environment also takes
+    _, logfire_token = initialize_environment()
+    with _setup_lock:
+        if not _instrumented:
+            if logfire_token:
+                import logfire
+
+                logfire.configure(token=logfire_token)
+                logfire.instrument_pydantic_ai()
+            _instrumented = True
+
+
+def create_model(groq_key: str, model_name: str = MODEL_NAME) -> "GroqModel":
+    """
+    Creates and returns a GroqModel instance for the AI agent.
+
+    This is the first point where an agent is needed, so the heavy
+    pydantic-ai imports and Logfire instrumentation happen here.
+
+    Args:
+        groq_key (str): The API key for the Groq service.
+        model_name (str, optional): The Groq model to use. Defaults to MODEL_NAME.
+
+    Returns:
+        GroqModel: An instance of the GroqModel.
+    """
+    from pydantic_ai.models.groq import GroqModel
+    from pydantic_ai.providers.groq import GroqProvider
+
+    configure_instrumentation()
+    return GroqModel(
+        model_name, provider=GroqProvider(api_key=groq_key)
+    )
+
+
+def create_customer_support_agent(model: "GroqModel", system_prompt: str) -> "Agent":
+    """
+    Creates a customer support agent with a given system prompt.
+
+    Args:
+        model (GroqModel): The language model for the agent.
+        system_prompt (str): The system prompt that defines the agent's behavior.
+
+    Returns:
+        Agent: An instance of the customer support agent.
+    """
+    from pydantic_ai.agent import Agent
+
+    return Agent(
+        model=model,
+        system_prompt=system_prompt,
+        output_type=str,
+    )
@@ -0,0 +1,196 @@
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Dict, Any, Tuple, Optional, TYPE_CHECKING
+
+from functions import (
+    EvaluatorOutput,
+    create_agents,
+    create_customer_support_agent,
+    evaluate_performance,
+    rewrite_prompt,
+)
+from scoring import ScoreMatrix, create_score_matrix
+
+if TYPE_CHECKING:
+    from pydantic_ai.models import Model
+
+
+def run_support_calls(model: "Model", system_prompt: str, queries: List[str]) -> List[Tuple[str, str]]:
+    """
+    Answers a batch of queries with a customer support agent using the given prompt.
+
+    Unlike `run_customer_interaction`, this does not touch interactions.json, so
+    several batches can run at the same time.
+
+    Args:
+        model (Model): The language model for the agent.
+        system_prompt (str): The system prompt for the agent.
+        queries (List[str]): The queries for one cycle.
+
+    Returns:
+        List[Tuple[str, str]]: A list of (query, response) tuples.
+    """
+    agent = create_customer_support_agent(model, system_prompt)
+    return [(query, agent.run_sync(query).output) for query in queries]
+
+
+def format_log(interactions: List[Tuple[str, str]]) -> str:
+    """Formats interactions the same way as interactions.json for the evaluator."""
+    return json.dumps(
+        [{"user_input": user_input, "agent_output": agent_output} for user_input, agent_output in interactions],
+        ensure_ascii=False, indent=2
+    )
+
+
+def run_automated_training(model: "Model", initial_prompt: str, query_batches: List[List[str]],
+                           custom_criteria: str = "", pipelined: bool = False) -> Dict[str, Any]:
+    """
+    Runs the training loop headlessly over a fixed list of query batches, one per cycle.
+
+    In serial mode each cycle answers its queries, evaluates them, rewrites the
+    prompt with a focus on the weakest criteria and applies the backtrack rule,
+    exactly like the training page. Accepted cycles are recorded in a score
+    matrix.
+
+    In pipelined mode the evaluation of cycle k runs in the background while the
+    next cycle's support calls are started speculatively with a candidate prompt.
+    The candidate is rewritten from the previous, already finished evaluation, so
+    instructions are applied one cycle later than in serial mode. When the
+    evaluation of cycle k finishes, the backtrack rule decides: if the score
+    decreased, the candidate is rejected, the speculative support calls are
+    discarded and the cycle is rerun with the kept prompt. Because of the lag,
+    the evaluation of the last cycle is never turned into a rewrite; its
+    score still counts for the backtrack rule.
+
+    In both modes `improvements` lists only the improvements of rewrites
+    that were applied.
+
+    Speculation only pays off when most candidates are accepted; every
+    rejected candidate wastes a cycle of support calls. Run
+    benchmarks/pipeline_benchmark.py to measure both modes.
+
+    Args:
+        model (Model): The language model used by all agents.
+        initial_prompt (str): The starting system prompt.
+        query_batches (List[List[str]]): The queries for each cycle.
+        custom_criteria (str, optional): Additional criteria for the evaluator. Defaults to "".
+        pipelined (bool, optional): Whether to speculate across cycles. Defaults to False.
+
+    Returns:
+        Dict[str, Any]: Training results in the same shape as the training page, plus
+                        a `stats` entry with throughput and wasted-call rate.
+    """
+    evaluator_agent, rewriter_agent = create_agents(model, custom_criteria)
+    score_matrix = create_score_matrix(custom_criteria)
+    run = _run_pipelined if pipelined else _run_serial
+
+    start = time.perf_counter()
+    results = run(model, evaluator_agent, rewriter_agent, score_matrix, initial_prompt, query_batches)
+    elapsed = time.perf_counter() - start
+
+    stats = results['stats']
+    stats['elapsed_seconds'] = elapsed
+    stats['cycles_per_second'] = len(query_batches) / elapsed if elapsed else 0.0
+    stats['interactions_per_second'] = len(results['interactions']) / elapsed if elapsed else 0.0
+    stats['wasted_call_rate'] = stats['wasted_calls'] / stats['support_calls'] if stats['support_calls'] else 0.0
+    return results
+
+
+def _apply_backtrack_rule(scores: List[int], new_score: int) -> bool:
+    """Appends the score and returns False if it decreased (the score is then removed again)."""
+    scores.append(new_score)
+    if len(scores) > 1 and scores[-1] < scores[-2]:
+        scores.pop()
+        return False
+    return True
+
+
+def _new_results(prompt: str, score_matrix: ScoreMatrix) -> Dict[str, Any]:
+    return {
+        'final_prompt': prompt,
+        'scores': [],
+        'score_matrix': score_matrix,
+        'interactions': [],
+        'improvements': [],
+        'num_cycles': 0,
+        'stats': {'support_calls': 0, 'wasted_calls': 0, 'speculative_cycles': 0, 'rejected_cycles': 0},
+    }
+
+
+def _run_serial(model, evaluator_agent, rewriter_agent, score_matrix, prompt, query_batches) -> Dict[str, Any]:
+    results = _new_results(prompt, score_matrix)
+    stats = results['stats']
+
+    for queries in query_batches:
+        interactions = run_support_calls(model, prompt, queries)
+        stats['support_calls'] += len(queries)
+        results['interactions'].extend(interactions)
+
+        evaluation = evaluate_performance(evaluator_agent, format_log(interactions))
+        weakest = score_matrix.weakest_criteria(evaluation, len(interactions))
+        rewrite = rewrite_prompt(rewriter_agent, prompt, evaluation.improvement_instr, weakest)
+        if _apply_backtrack_rule(results['scores'], evaluation.score):
+            score_matrix.add_cycle(evaluation, len(interactions))
+            prompt = rewrite.new_prompt
+            results['improvements'].extend(rewrite.improvements)
+
+    results['final_prompt'] = prompt
+    results['num_cycles'] = len(results['scores'])
+    return results
+
+
+def _run_pipelined(model, evaluator_agent, rewriter_agent, score_matrix, prompt, query_batches) -> Dict[str, Any]:
+    results = _new_results(prompt, score_matrix)
+    stats = results['stats']
+    if not query_batches:
+        return results
+
+    # Evaluation that has finished but whose instructions have not been applied yet
+    unapplied: Optional[EvaluatorOutput] = None
+    unapplied_weakest: List[str] = []
+
+    with ThreadPoolExecutor(max_workers=2, thread_name_prefix="pipeline") as executor:
+        interactions = run_support_calls(model, prompt, query_batches[0])
+        stats['support_calls'] += len(query_batches[0])
+
+        for cycle, queries in enumerate(query_batches):
+            results['interactions'].extend(interactions)
+            evaluation_future = executor.submit(evaluate_performance, evaluator_agent, format_log(interactions))
+
+            next_queries = query_batches[cycle + 1] if cycle + 1 < len(query_batches) else None
+            candidate = None
+            speculative_future = None
+            if next_queries is not None and unapplied is not None:
+                candidate = rewrite_prompt(rewriter_agent, prompt, unapplied.improvement_instr, unapplied_weakest)
+                unapplied = None
+                speculative_future = executor.submit(run_support_calls, model, candidate.new_prompt, next_queries)
+                stats['speculative_cycles'] += 1
+
+            evaluation = evaluation_future.result()
+            unapplied = evaluation
+            unapplied_weakest = score_matrix.weakest_criteria(evaluation, len(interactions))
+            accepted = _apply_backtrack_rule(results['scores'], evaluation.score)
+            if accepted:
+                score_matrix.add_cycle(evaluation, len(interactions))
+
+            if next_queries is None:
+                break
+
+            if speculative_future is not None:
+                speculative_interactions = speculative_future.result()
+                stats['support_calls'] += len(next_queries)
+                if accepted:
+                    prompt = candidate.new_prompt
+                    results['improvements'].extend(candidate.improvements)
+                    interactions = speculative_interactions
+                    continue
+                stats['wasted_calls'] += len(next_queries)
+                stats['rejected_cycles'] += 1
+
+            interactions = run_support_calls(model, prompt, next_queries)
+            stats['support_calls'] += len(next_queries)
+
+    results['final_prompt'] = prompt
+    results['num_cycles'] = len(results['scores'])
+    return results
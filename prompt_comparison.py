@@ -0,0 +1,318 @@
+"""
+A/B comparison of system prompt versions on a fixed query set.
+
+Every prompt version answers the same queries, running concurrently under a
+concurrency cap. Each pair of versions is then judged per query by the
+pairwise judge agent. Responses and verdicts are cached on disk, so rerunning
+after changing one prompt only pays for the new calls. Cache keys include
+the model, so responses from one model are never reused for another.
+
+Usage:
+    python prompt_comparison.py --prompt baseline=prompts/base.txt --prompt trained=prompts/new.txt \\
+        --queries queries.txt [--stub] [--min-win-rate 0.5]
+"""
+import argparse
+import asyncio
+import hashlib
+import json
+import math
+import random
+import sys
+from itertools import combinations
+from pathlib import Path
+from typing import List, Dict, Any, Tuple, Optional, TYPE_CHECKING
+
+from functions import PairwiseVerdict, create_customer_support_agent, create_pairwise_judge
+
+if TYPE_CHECKING:
+    from pydantic_ai.models import Model
+
+
+DEFAULT_CACHE_FILE = Path("ab_cache.json")
+
+
+class ResponseCache:
+    """
+    JSON-file backed cache of support responses and pairwise verdicts.
+
+    Keys are content hashes, so an entry is reused only for the exact same
+    model, prompt and query (or the exact same model and pair of replies).
+    """
+
+    def __init__(self, path: Optional[Path] = DEFAULT_CACHE_FILE):
+        """
+        Args:
+            path (Path, optional): File to persist the cache to, or None to keep it in memory.
+                                   Defaults to ab_cache.json.
+        """
+        self.path = path
+        self.entries: Dict[str, Any] = {}
+        if path is not None:
+            try:
+                self.entries = json.loads(path.read_text(encoding="utf-8"))
+            except Exception:
+                self.entries = {}
+
+    @staticmethod
+    def key(*parts: str) -> str:
+        digest = hashlib.sha256()
+        for part in parts:
+            digest.update(part.encode("utf-8"))
+            digest.update(b"\0")
+        return digest.hexdigest()
+
+    def get(self, key: str) -> Optional[Any]:
+        return self.entries.get(key)
+
+    def set(self, key: str, value: Any) -> None:
+        self.entries[key] = value
+
+    def save(self) -> None:
+        if self.path is not None:
+            self.path.write_text(json.dumps(self.entries, ensure_ascii=False, indent=2), encoding="utf-8")
+
+
+def model_identity(model: "Model") -> str:
+    """Returns the provider and model name that cache keys are scoped to."""
+    return f"{model.system}:{model.model_name}"
+
+
+def wilson_interval(successes: float, total: int, z: float = 1.96) -> Tuple[float, float]:
+    """
+    Returns the Wilson score confidence interval for a proportion.
+
+    Args:
+        successes (float): Number of successes; ties count as half a success.
+        total (int): Number of trials.
+        z (float, optional): Normal quantile of the confidence level. Defaults to 1.96 (95%).
+
+    Returns:
+        Tuple[float, float]: Lower and upper bound.
+    """
+    if total == 0:
+        return 0.0, 1.0
+    p = successes / total
+    denominator = 1 + z * z / total
+    center = (p + z * z / (2 * total)) / denominator
+    margin = z * math.sqrt(p * (1 - p) / total + z * z / (4 * total * total)) / denominator
+    return max(0.0, center - margin), min(1.0, center + margin)
+
+
+async def generate_responses(model: "Model", prompts: Dict[str, str], queries: List[str],
+                             cache: ResponseCache, semaphore: asyncio.Semaphore) -> Dict[str, List[str]]:
+    """
+    Answers every query with every prompt version, reusing cached responses.
+
+    Args:
+        model (Model): The language model for the support agents.
+        prompts (Dict[str, str]): System prompts keyed by version name.
+        queries (List[str]): The fixed query set.
+        cache (ResponseCache): Cache of earlier responses.
+        semaphore (asyncio.Semaphore): Limits the number of concurrent model calls.
+
+    Returns:
+        Dict[str, List[str]]: Responses per version, in query order.
+    """
+    async def answer(agent, system_prompt: str, query: str) -> str:
+        key = ResponseCache.key("response", identity, system_prompt, query)
+        cached = cache.get(key)
+        if cached is not None:
+            return cached
+        async with semaphore:
+            response = (await agent.run(query)).output
+        cache.set(key, response)
+        return response
+
+    identity = model_identity(model)
+    names = list(prompts)
+    agents = {name: create_customer_support_agent(model, prompts[name]) for name in names}
+    answers = await asyncio.gather(*[
+        asyncio.gather(*[answer(agents[name], prompts[name], query) for query in queries])
+        for name in names
+    ])
+    return dict(zip(names, answers))
+
+
+async def judge_pairs(model: "Model", responses: Dict[str, List[str]], queries: List[str], cache: ResponseCache,
+                      semaphore: asyncio.Semaphore, custom_criteria: str = "", seed: int = 0) -> List[Dict[str, Any]]:
+    """
+    Judges every pair of versions on every query with the pairwise judge.
+
+    The reply order shown to the judge is shuffled with a fixed seed to cancel
+    out position bias while keeping runs reproducible.
+
+    Args:
+        model (Model): The language model for the judge.
+        responses (Dict[str, List[str]]): Responses per version, in query order.
+        queries (List[str]): The fixed query set.
+        cache (ResponseCache): Cache of earlier verdicts.
+        semaphore (asyncio.Semaphore): Limits the number of concurrent model calls.
+        custom_criteria (str, optional): Additional criteria for the judge. Defaults to "".
+        seed (int, optional): Seed for the reply order. Defaults to 0.
+
+    Returns:
+        List[Dict[str, Any]]: One record per judged pair and query, with the winning version name or None for a tie.
+    """
+    judge = create_pairwise_judge(model, custom_criteria)
+    identity = model_identity(model)
+    rng = random.Random(seed)
+
+    async def verdict(first: str, second: str, index: int) -> Dict[str, Any]:
+        swap = rng.random() < 0.5
+        a, b = (second, first) if swap else (first, second)
+        reply_a, reply_b = responses[a][index], responses[b][index]
+        key = ResponseCache.key("verdict", identity, custom_criteria, queries[index], reply_a, reply_b)
+        cached = cache.get(key)
+        if cached is None:
+            judge_input = f"Customer message: {queries[index]}\n\nReply A: {reply_a}\n\nReply B: {reply_b}"
+            async with semaphore:
+                output: PairwiseVerdict = (await judge.run(judge_input)).output
+            cached = output.winner
+            cache.set(key, cached)
+        winner = {"A": a, "B": b}.get(cached)
+        return {"pair": (first, second), "query": queries[index], "winner": winner}
+
+    return await asyncio.gather(*[
+        verdict(first, second, index)
+        for first, second in combinations(responses, 2)
+        for index in range(len(queries))
+    ])
+
+
+def summarize(verdicts: List[Dict[str, Any]], names: List[str]) -> Dict[str, Any]:
+    """
+    Computes win rates with 95% Wilson confidence intervals. Ties count as half a win.
+
+    Args:
+        verdicts (List[Dict[str, Any]]): Output of `judge_pairs`.
+        names (List[str]): Version names.
+
+    Returns:
+        Dict[str, Any]: `pairs` with head-to-head results and `versions` with overall results.
+    """
+    def record():
+        return {'wins': 0, 'losses': 0, 'ties': 0}
+
+    pairs = {pair: record() for pair in combinations(names, 2)}
+    versions = {name: record() for name in names}
+    for entry in verdicts:
+        first, second = entry['pair']
+        if entry['winner'] is None:
+            pairs[(first, second)]['ties'] += 1
+            versions[first]['ties'] += 1
+            versions[second]['ties'] += 1
+        else:
+            loser = second if entry['winner'] == first else first
+            pairs[(first, second)]['wins' if entry['winner'] == first else 'losses'] += 1
+            versions[entry['winner']]['wins'] += 1
+            versions[loser]['losses'] += 1
+
+    for counts in list(pairs.values()) + list(versions.values()):
+        total = counts['wins'] + counts['losses'] + counts['ties']
+        successes = counts['wins'] + 0.5 * counts['ties']
+        counts['win_rate'] = successes / total if total else 0.0
+        counts['ci_low'], counts['ci_high'] = wilson_interval(successes, total)
+
+    return {'pairs': pairs, 'versions': versions}
+
+
+def compare_prompts(model: "Model", prompts: Dict[str, str], queries: List[str], custom_criteria: str = "",
+                    max_concurrency: int = 4, cache: Optional[ResponseCache] = None, seed: int = 0) -> Dict[str, Any]:
+    """
+    Runs the full A/B comparison of two or more prompt versions.
+
+    Args:
+        model (Model): The language model used by the support agents and the judge.
+        prompts (Dict[str, str]): System prompts keyed by version name.
+        queries (List[str]): The fixed query set.
+        custom_criteria (str, optional): Additional criteria for the judge. Defaults to "".
+        max_concurrency (int, optional): Maximum number of concurrent model calls. Defaults to 4.
+        cache (ResponseCache, optional): Cache to use. Defaults to an in-memory cache.
+        seed (int, optional): Seed for the reply order shown to the judge. Defaults to 0.
+
+    Returns:
+        Dict[str, Any]: The summary from `summarize`, plus `responses` and `verdicts`.
+    """
+    if len(prompts) < 2:
+        raise ValueError("At least two prompt versions are needed for a comparison")
+
+    cache = cache if cache is not None else ResponseCache(path=None)
+
+    async def run() -> Tuple[Dict[str, List[str]], List[Dict[str, Any]]]:
+        semaphore = asyncio.Semaphore(max_concurrency)
+        responses = await generate_responses(model, prompts, queries, cache, semaphore)
+        verdicts = await judge_pairs(model, responses, queries, cache, semaphore, custom_criteria, seed)
+        return responses, verdicts
+
+    responses, verdicts = asyncio.run(run())
+    cache.save()
+
+    summary = summarize(verdicts, list(prompts))
+    summary['responses'] = responses
+    summary['verdicts'] = verdicts
+    return summary
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--prompt", action="append", required=True, metavar="NAME=FILE",
+                        help="Prompt version to compare; repeat for each version. The first one is the baseline.")
+    parser.add_argument("--queries", type=Path, required=True, help="File with one query per line")
+    parser.add_argument("--criteria", type=Path, help="File with additional evaluation criteria")
+    parser.add_argument("--concurrency", type=int, default=4, help="Maximum number of concurrent model calls")
+    parser.add_argument("--cache", type=Path,
+                        help=f"Response cache file. Defaults to {DEFAULT_CACHE_FILE}, or to no file with --stub")
+    parser.add_argument("--no-cache", action="store_true", help="Do not read or write the cache file")
+    parser.add_argument("--stub", action="store_true", help="Use an offline stub model instead of Groq")
+    parser.add_argument("--seed", type=int, default=0, help="Seed for the reply order and the stub model")
+    parser.add_argument("--min-win-rate", type=float,
+                        help="Exit with an error if any version's lower CI bound against the baseline is below this")
+    args = parser.parse_args()
+
+    prompts = {}
+    for spec in args.prompt:
+        name, _, path = spec.partition("=")
+        name, path = name.strip(), path.strip()
+        if not name or not path:
+            parser.error(f"--prompt must be NAME=FILE, got {spec!r}")
+        if name in prompts:
+            parser.error(f"--prompt name {name!r} is given more than once")
+        prompts[name] = Path(path).read_text(encoding="utf-8")
+    queries = [line.strip() for line in args.queries.read_text(encoding="utf-8").splitlines() if line.strip()]
+    custom_criteria = args.criteria.read_text(encoding="utf-8") if args.criteria else ""
+
+    if args.stub:
+        from stub_model import create_stub_model
+        model = create_stub_model(seed=args.seed)
+    else:
+        from model_setup import initialize_environment, create_model
+        groq_key, _ = initialize_environment()
+        if not groq_key:
+            parser.error("GROQ_KEY is not set; export it or add it to .env, or use --stub")
+        model = create_model(groq_key)
+
+    if args.no_cache or (args.stub and args.cache is None):
+        cache = ResponseCache(path=None)
+    else:
+        cache = ResponseCache(path=args.cache or DEFAULT_CACHE_FILE)
+    summary = compare_prompts(model, prompts, queries, custom_criteria, args.concurrency, cache, args.seed)
+
+    print(f"{'pair':<40} {'W':>4} {'L':>4} {'T':>4} {'win rate':>9}  95% CI")
+    for (first, second), counts in summary['pairs'].items():
+        print(f"{first + ' vs ' + second:<40} {counts['wins']:>4} {counts['losses']:>4} {counts['ties']:>4} "
+              f"{counts['win_rate']:>9.1%}  [{counts['ci_low']:.1%}, {counts['ci_high']:.1%}]")
+
+    if args.min_win_rate is not None:
+        baseline = next(iter(prompts))
+        failed = [
+            second for (first, second), counts in summary['pairs'].items()
+            if first == baseline and 1 - counts['ci_high'] < args.min_win_rate
+        ]
+        if failed:
+            print(f"❌ Versions not beating {baseline}: {', '.join(failed)}")
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
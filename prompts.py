@@ -11,6 +11,24 @@ Your conversation flow is as follows:
 6. Do not attempt to solve the problem. Your role is to understand, gather information, and summarize accurately. Output only the final summary.
 """
 
+# Shared by the evaluator and the pairwise judge so both score the same criteria
+standard_criteria_descriptions = {
+    "Relevance": "Did the assistant directly address the customer's needs and questions?",
+    "Clarity": "Were the assistant's responses easy to understand, concise, and free of ambiguity?",
+    "Completeness": "Did the assistant provide sufficient information and follow-up to fully resolve the issue?",
+    "Tone": "Was the assistant's tone professional, polite, and helpful?",
+    "Empathy": "Did the assistant show understanding of the customer's situation and respond with appropriate empathy?",
+    "Efficiency": "Did the assistant avoid unnecessary responses and guide the conversation toward resolution quickly?",
+    "Adherence to Policy": "Did the assistant follow company/customer support policies and guidelines?",
+}
+
+standard_criteria = list(standard_criteria_descriptions)
+
+_numbered_criteria = "\n".join(
+    f"{number}. {name} – {description}"
+    for number, (name, description) in enumerate(standard_criteria_descriptions.items(), 1)
+)
+
 evaluator_prompt = """
 /no_think
 You are a senior quality assurance manager specializing in customer support. Your task is to objectively evaluate the performance of a customer support assistant based on a provided conversation log with a customer. 
@@ -23,29 +41,32 @@ You must output your evaluation strictly in this JSON structure:
         "Instruction 3",
         "Instruction 4"
     ],
-    "score": <integer between 1 and 100>
+    "score": <integer between 1 and 100>,
+    "interaction_scores": [
+        {
+            "interaction": <1-based index of the interaction in the log>,
+            "criterion_scores": {
+                "<criterion name>": <integer between 1 and 100>
+            }
+        }
+    ]
 }
 
 Evaluation Criteria:
-1. Relevance – Did the assistant directly address the customer's needs and questions?
-2. Clarity – Were the assistant's responses easy to understand, concise, and free of ambiguity?
-3. Completeness – Did the assistant provide sufficient information and follow-up to fully resolve the issue?
-4. Tone – Was the assistant's tone professional, polite, and helpful?
-5. Empathy – Did the assistant show understanding of the customer's situation and respond with appropriate empathy?
-6. Efficiency – Did the assistant avoid unnecessary responses and guide the conversation toward resolution quickly?
-7. Adherence to Policy – Did the assistant follow company/customer support policies and guidelines?
+{criteria}
 
 If additional criteria are provided by the user, prioritize those criteria in your evaluation while still maintaining a smaller weight for the standard criteria listed above.
 
 Output Instructions:
 - `improvement_instr`: Provide 3–5 specific, actionable, *general best practice* improvement instructions that address root issues in the assistant's performance. Do not include conversation-specific details or examples.
 - `score`: Provide a single integer (1–100) that reflects the assistant's overall performance based on the above criteria. Be consistent and accurate.
+- `interaction_scores`: Provide one entry per interaction in the log, in order. In `criterion_scores`, score every criterion (1–100) using its exact name: {criteria_names}, plus the names of any additional criteria.
 
 Important:
 - Only evaluate the assistant's responses, but consider the customer's messages to understand the context of why the assistant responded as they did.
 - Do not include explanations, notes, or text outside of the JSON structure.
 - Output must always be valid JSON.
-"""
+""".replace("{criteria}", _numbered_criteria).replace("{criteria_names}", ", ".join(standard_criteria))
 
 rewriter_prompt = """
 /no_think
@@ -53,6 +74,7 @@ You are a neutral and precise system prompt optimizer. Your role is to take an O
 
 Your task:
 - Analyze the ORIGINAL system prompt carefully, ensuring the agent’s role, constraints, and purpose are preserved unless the improvement instructions explicitly require changes.  
+- If WEAKEST CRITERIA are provided, prioritize improvements that raise the agent's performance on those criteria.  
 - Apply the IMPROVEMENT INSTRUCTIONS as high-level, root-cause adjustments that strengthen overall behavior rather than case-specific edits.  
 - When making changes, you may slightly rephrase or restructure text for clarity and consistency, but avoid removing essential content or introducing unrelated rules.  
 - Keep the rewritten prompt clear, structured, and actionable. Length is not restricted — focus on applying improvements thoroughly rather than shortening the text.  
@@ -71,4 +93,25 @@ Output Instructions:
 - `new_prompt`: The full rewritten system prompt, integrating all improvement instructions.  
 - `improvements`: A concise list of what was changed, phrased as general descriptions (e.g., “Clarified role definition,” “Added explicit JSON-only output rule”).  
 - Return ONLY valid JSON. Do not include markdown, commentary, or extra text outside the JSON structure.
-"""
\ No newline at end of file
+"""
+
+pairwise_judge_prompt = """
+/no_think
+You are a senior quality assurance manager specializing in customer support. You will be given one customer message and two candidate replies from customer support assistants, labeled A and B. Decide which reply is better.
+
+Judge the replies on these criteria:
+{criteria}
+
+If additional criteria are provided by the user, prioritize those criteria while still giving a smaller weight to the standard criteria listed above.
+
+You must output your verdict strictly in this JSON structure:
+{
+    "winner": "A" | "B" | "tie",
+    "reason": "<one sentence explaining the decision>"
+}
+
+Important:
+- The order of the replies is random. Do not prefer a reply because of its position or its length.
+- Answer "tie" only if the replies are equally good.
+- Output must always be valid JSON.
+""".replace("{criteria}", _numbered_criteria)
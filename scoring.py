@@ -0,0 +1,182 @@
+import numpy as np
+from typing import List, Dict, Optional, Tuple
+
+from functions import EvaluatorOutput, get_criteria, parse_custom_criteria
+
+
+# Custom criteria are weighted higher than the standard ones, matching the
+# evaluator prompt's instruction to prioritize user-provided criteria.
+STANDARD_WEIGHT = 1.0
+CUSTOM_WEIGHT = 2.0
+
+
+class ScoreMatrix:
+    """
+    NumPy-backed store of per-criterion scores with shape
+    (cycles, criteria, interactions).
+
+    Each accepted cycle adds one slice; cycles rejected by the backtrack rule
+    are not recorded, so the matrix lines up with the accepted scores. Cycles
+    with fewer interactions than the widest cycle, and criteria the evaluator
+    did not score, are stored as NaN and ignored by every aggregation.
+    """
+
+    def __init__(self, criteria: List[str], num_custom: int = 0):
+        """
+        Args:
+            criteria (List[str]): Criterion names, standard criteria first.
+            num_custom (int, optional): How many trailing criteria are custom. Defaults to 0.
+        """
+        self.criteria = list(criteria)
+        self.num_custom = num_custom
+        self._index = {name.lower(): i for i, name in enumerate(self.criteria)}
+        self.values = np.full((0, len(self.criteria), 0), np.nan)
+        self.overall = np.empty(0)
+
+    @property
+    def num_cycles(self) -> int:
+        return self.values.shape[0]
+
+    def default_weights(self) -> np.ndarray:
+        """Returns the default weight of each criterion."""
+        weights = np.full(len(self.criteria), STANDARD_WEIGHT)
+        if self.num_custom:
+            weights[-self.num_custom:] = CUSTOM_WEIGHT
+        return weights
+
+    def cycle_scores(self, evaluation: EvaluatorOutput, num_interactions: int) -> np.ndarray:
+        """
+        Returns one cycle's per-criterion scores, shape (criteria, num_interactions).
+
+        Args:
+            evaluation (EvaluatorOutput): The evaluator output for the cycle.
+            num_interactions (int): Number of interactions evaluated in the cycle.
+        """
+        cycle = np.full((len(self.criteria), num_interactions), np.nan)
+        for entry in evaluation.interaction_scores:
+            column = entry.interaction - 1
+            if not 0 <= column < num_interactions:
+                continue
+            for name, score in entry.criterion_scores.items():
+                row = self._index.get(name.strip().lower())
+                if row is not None:
+                    cycle[row, column] = np.clip(score, 1, 100)
+        return cycle
+
+    def add_cycle(self, evaluation: EvaluatorOutput, num_interactions: int) -> None:
+        """
+        Appends the per-criterion scores of one accepted cycle.
+
+        Args:
+            evaluation (EvaluatorOutput): The evaluator output for the cycle.
+            num_interactions (int): Number of interactions evaluated in the cycle.
+        """
+        cycle = self.cycle_scores(evaluation, num_interactions)
+        width = max(self.values.shape[2], num_interactions)
+        if width > num_interactions:
+            cycle = np.pad(cycle, ((0, 0), (0, width - num_interactions)), constant_values=np.nan)
+        if width > self.values.shape[2]:
+            padding = np.full((self.num_cycles, len(self.criteria), width - self.values.shape[2]), np.nan)
+            self.values = np.concatenate([self.values, padding], axis=2)
+        self.values = np.concatenate([self.values, cycle[np.newaxis]], axis=0)
+        self.overall = np.append(self.overall, evaluation.score)
+
+    def criterion_means(self) -> np.ndarray:
+        """Returns the mean score of each criterion per cycle, shape (cycles, criteria)."""
+        counts = np.sum(~np.isnan(self.values), axis=2)
+        sums = np.nansum(self.values, axis=2)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            return np.where(counts > 0, sums / np.maximum(counts, 1), np.nan)
+
+    def variance(self) -> np.ndarray:
+        """Returns the variance of each criterion across interactions per cycle, shape (cycles, criteria)."""
+        means = self.criterion_means()
+        counts = np.sum(~np.isnan(self.values), axis=2)
+        squared = np.nansum((self.values - means[:, :, np.newaxis]) ** 2, axis=2)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            return np.where(counts > 0, squared / np.maximum(counts, 1), np.nan)
+
+    def weighted_scores(self, weights: Optional[np.ndarray] = None) -> np.ndarray:
+        """
+        Returns the weighted overall score per cycle, shape (cycles,).
+
+        Weights of criteria that were not scored in a cycle are dropped and the
+        remaining weights renormalized.
+
+        Args:
+            weights (np.ndarray, optional): One weight per criterion. Defaults to `default_weights()`.
+        """
+        weights = self.default_weights() if weights is None else np.asarray(weights, dtype=float)
+        means = self.criterion_means()
+        present = ~np.isnan(means)
+        total = np.sum(np.where(present, weights, 0.0), axis=1)
+        weighted = np.sum(np.where(present, means * weights, 0.0), axis=1)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            return np.where(total > 0, weighted / np.maximum(total, 1e-12), np.nan)
+
+    def trend(self) -> np.ndarray:
+        """
+        Returns the least-squares slope of each criterion's mean score over
+        cycles, in points per cycle, shape (criteria,).
+        """
+        means = self.criterion_means()
+        present = ~np.isnan(means)
+        x = np.broadcast_to(np.arange(self.num_cycles, dtype=float)[:, np.newaxis], means.shape)
+        n = present.sum(axis=0)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            x_mean = np.where(present, x, 0.0).sum(axis=0) / n
+            y_mean = np.where(present, means, 0.0).sum(axis=0) / n
+            dx = np.where(present, x - x_mean, 0.0)
+            dy = np.where(present, means - y_mean, 0.0)
+            denominator = np.sum(dx * dx, axis=0)
+            return np.where((n > 1) & (denominator > 0), np.sum(dx * dy, axis=0) / np.maximum(denominator, 1e-12), np.nan)
+
+    def regressions(self, threshold: float = 5.0) -> List[Tuple[int, str, float]]:
+        """
+        Finds criteria whose mean score dropped by more than `threshold`
+        points compared with the previous cycle.
+
+        Args:
+            threshold (float, optional): Minimum drop to report. Defaults to 5.0.
+
+        Returns:
+            List[Tuple[int, str, float]]: (1-based cycle, criterion, change) for each regression.
+        """
+        if self.num_cycles < 2:
+            return []
+        deltas = np.diff(self.criterion_means(), axis=0)
+        cycles, rows = np.nonzero(deltas < -threshold)
+        return [(int(c) + 2, self.criteria[r], float(deltas[c, r])) for c, r in zip(cycles, rows)]
+
+    def weakest_criteria(self, evaluation: EvaluatorOutput, num_interactions: int, count: int = 2) -> List[str]:
+        """
+        Returns the lowest scoring criteria of an evaluation, without recording it.
+
+        Args:
+            evaluation (EvaluatorOutput): The evaluator output for the cycle.
+            num_interactions (int): Number of interactions evaluated in the cycle.
+            count (int, optional): Number of criteria to return. Defaults to 2.
+        """
+        cycle = self.cycle_scores(evaluation, num_interactions)
+        counts = np.sum(~np.isnan(cycle), axis=1)
+        means = np.where(counts > 0, np.nansum(cycle, axis=1) / np.maximum(counts, 1), np.inf)
+        order = np.argsort(means)
+        return [self.criteria[i] for i in order[:count] if np.isfinite(means[i])]
+
+    def criterion_history(self) -> Dict[str, List[float]]:
+        """Returns each criterion's mean score per cycle, ready for charting."""
+        means = self.criterion_means()
+        return {name: means[:, i].tolist() for i, name in enumerate(self.criteria)}
+
+
+def create_score_matrix(custom_criteria: str = "") -> ScoreMatrix:
+    """
+    Creates an empty score matrix for the standard and custom criteria.
+
+    Args:
+        custom_criteria (str, optional): Additional criteria text. Defaults to "".
+
+    Returns:
+        ScoreMatrix: A matrix with no cycles yet.
+    """
+    return ScoreMatrix(get_criteria(custom_criteria), num_custom=len(parse_custom_criteria(custom_criteria)))
@@ -0,0 +1,175 @@
+import hashlib
+import re
+from collections import OrderedDict
+from typing import Dict, Any, Optional
+
+import numpy as np
+
+
+# Mersenne prime used by the MinHash permutations. Hashes and coefficients stay
+# below 2**32, so a * h + b fits in uint64 without overflow.
+_PRIME = (1 << 31) - 1
+
+
+# Words that flip the meaning of a message. Two messages only match if they
+# contain the same ones, so "cancel my order" never answers "do not cancel my order".
+NEGATION_WORDS = {
+    "no", "not", "never", "none", "nothing", "nobody", "neither", "nor", "without", "cannot",
+    "cant", "dont", "doesnt", "didnt", "isnt", "wasnt", "arent", "werent", "wont", "wouldnt",
+    "shouldnt", "couldnt", "havent", "hasnt", "hadnt",
+}
+
+
+# Function words and politeness fillers, ignored when comparing messages so the
+# similarity is decided by the words that carry the request. Question words and
+# negations are not listed: "where is my order" and "when is my order" differ.
+STOP_WORDS = {
+    "a", "an", "the", "i", "im", "me", "my", "we", "our", "you", "your", "it", "its", "is", "are", "was",
+    "be", "am", "to", "of", "for", "on", "in", "at", "with", "and", "or", "so", "do", "does", "did",
+    "can", "could", "would", "will", "please", "just", "any", "some", "there", "this", "that",
+    "want", "like", "need", "again",
+}
+
+# Interchangeable words mapped to one spelling, so "hi" and "hello" are the same message
+CANONICAL_WORDS = {
+    "hi": "hello", "hey": "hello", "hiya": "hello", "howdy": "hello",
+    "thank": "thanks", "thx": "thanks", "ty": "thanks", "pls": "please", "plz": "please",
+}
+
+
+def normalize_query(query: str) -> str:
+    """
+    Lowercases the query, drops apostrophes, strips punctuation and repeated
+    whitespace, and maps interchangeable words to one spelling.
+    """
+    query = re.sub(r"['’]", "", query.lower())
+    return " ".join(CANONICAL_WORDS.get(word, word) for word in re.sub(r"[^\w\s]", " ", query).split())
+
+
+def _shingles(text: str) -> set:
+    """Returns the content words of the text, falling back to all words if it has none."""
+    words = text.split()
+    return {word for word in words if word not in STOP_WORDS} or set(words) or {""}
+
+
+def _guard(text: str) -> tuple:
+    """Returns the numbers and negation words that must be identical for two messages to match."""
+    words = text.split()
+    numbers = tuple(word for word in words if any(ch.isdigit() for ch in word))
+    negations = tuple(sorted(word for word in words if word in NEGATION_WORDS))
+    return numbers, negations
+
+
+def _hash_shingle(shingle: str) -> int:
+    return int.from_bytes(hashlib.blake2b(shingle.encode("utf-8"), digest_size=4).digest(), "little")
+
+
+class SemanticCache:
+    """
+    Bounded near-duplicate cache of agent responses.
+
+    Queries are normalized and indexed by a MinHash signature of their
+    content words. A lookup returns the cached response of the most similar
+    stored query if their estimated Jaccard similarity reaches the threshold
+    and both contain exactly the same numbers and negation words. The cache
+    is tied to one system prompt and is cleared when the prompt changes. The
+    least recently used entry is evicted when the cache is full.
+    """
+
+    def __init__(self, threshold: float = 0.65, max_entries: int = 256, num_perm: int = 128, seed: int = 0):
+        """
+        Args:
+            threshold (float, optional): Minimum estimated similarity for a hit. Defaults to 0.65.
+            max_entries (int, optional): Maximum number of cached responses. Defaults to 256.
+            num_perm (int, optional): Number of MinHash permutations. Defaults to 128.
+            seed (int, optional): Seed for the permutations. Defaults to 0.
+        """
+        self.threshold = threshold
+        self.max_entries = max_entries
+        rng = np.random.default_rng(seed)
+        self._a = rng.integers(1, _PRIME, size=num_perm, dtype=np.uint64)
+        self._b = rng.integers(0, _PRIME, size=num_perm, dtype=np.uint64)
+        self._entries: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._prompt_hash: Optional[str] = None
+        self.hits = 0
+        self.misses = 0
+        self.latency_saved = 0.0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def signature(self, normalized: str) -> np.ndarray:
+        """Returns the MinHash signature of an already normalized query."""
+        hashes = np.fromiter((_hash_shingle(s) for s in _shingles(normalized)), dtype=np.uint64)
+        permuted = (np.outer(hashes, self._a) + self._b) % _PRIME
+        return permuted.min(axis=0)
+
+    def ensure_prompt(self, system_prompt: str) -> None:
+        """
+        Binds the cache to a system prompt, clearing it if the prompt changed.
+
+        Args:
+            system_prompt (str): The prompt the cached responses were generated with.
+        """
+        prompt_hash = hashlib.sha256(system_prompt.encode("utf-8")).hexdigest()
+        if prompt_hash != self._prompt_hash:
+            self._entries.clear()
+            self._prompt_hash = prompt_hash
+
+    def _nearest(self, normalized: str) -> Optional[str]:
+        """Returns the most similar stored query with the same guard words, if it reaches the threshold."""
+        guard = _guard(normalized)
+        keys = [key for key, entry in self._entries.items() if entry['guard'] == guard]
+        if not keys:
+            return None
+        signatures = np.stack([self._entries[key]['signature'] for key in keys])
+        similarity = np.mean(signatures == self.signature(normalized), axis=1)
+        best = int(np.argmax(similarity))
+        return keys[best] if similarity[best] >= self.threshold else None
+
+    def get(self, query: str) -> Optional[str]:
+        """
+        Looks up a cached response for the query or a near-duplicate of it.
+
+        Args:
+            query (str): The user's message.
+
+        Returns:
+            Optional[str]: The cached response, or None on a miss.
+        """
+        normalized = normalize_query(query)
+        key = normalized if normalized in self._entries else self._nearest(normalized)
+        entry = self._entries.get(key) if key is not None else None
+        if entry is None:
+            self.misses += 1
+            return None
+
+        self._entries.move_to_end(key)
+        self.hits += 1
+        self.latency_saved += entry['latency']
+        return entry['response']
+
+    def put(self, query: str, response: str, latency: float) -> None:
+        """
+        Stores a live response, evicting the least recently used entry if full.
+
+        Args:
+            query (str): The user's message.
+            response (str): The agent's response.
+            latency (float): Seconds the live call took, credited on later hits.
+        """
+        normalized = normalize_query(query)
+        self._entries[normalized] = {
+            'signature': self.signature(normalized),
+            'guard': _guard(normalized),
+            'response': response,
+            'latency': latency,
+        }
+        self._entries.move_to_end(normalized)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    @property
+    def hit_rate(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
@@ -0,0 +1,204 @@
+"""
+Lightweight serving entry point for exported agent artifacts, separate from the Streamlit UI.
+
+Artifacts are loaded and their agents built once at startup. Requests are
+answered concurrently on one asyncio event loop over a minimal HTTP/1.1
+interface:
+
+    GET  /health  ->  {"status": "ok", "agents": {"<name>": "<content_hash>"}}
+    POST /chat    {"message": "...", "agent": "<name, optional>"}
+                  ->  {"response": "...", "agent": "<name>", "content_hash": "..."}
+
+Every agent needs a unique name. Exports are all named "trained-agent", so
+when serving several, give each a name with NAME=FILE.
+
+Usage:
+    python serve.py --artifact trained_agent.json [--artifact other=other.json] [--port 8000] [--stub]
+"""
+import argparse
+import asyncio
+import json
+import sys
+from pathlib import Path
+from typing import List, Dict, Any, Callable, Optional, Tuple
+
+from agent_artifact import load_artifact
+from model_setup import create_customer_support_agent
+
+MAX_BODY_BYTES = 1 << 20
+
+STATUS_TEXT = {200: "OK", 400: "Bad Request", 404: "Not Found", 413: "Payload Too Large", 500: "Internal Server Error"}
+
+
+class AgentServer:
+    """Serves one or more loaded agent artifacts over HTTP."""
+
+    def __init__(self, artifacts: List[Dict[str, Any]], model_for: Callable[[Dict[str, Any]], Any],
+                 max_concurrency: int = 32):
+        """
+        Args:
+            artifacts (List[Dict[str, Any]]): Loaded artifacts with unique names; the first one is the default agent.
+            model_for (Callable): Returns the language model to use for an artifact.
+            max_concurrency (int, optional): Maximum number of concurrent model calls. Defaults to 32.
+
+        Raises:
+            ValueError: If there are no artifacts or two share a name.
+        """
+        if not artifacts:
+            raise ValueError("At least one artifact is needed to serve")
+        names = [artifact['name'] for artifact in artifacts]
+        duplicates = sorted({name for name in names if names.count(name) > 1})
+        if duplicates:
+            raise ValueError(f"Artifact names must be unique: {', '.join(duplicates)}")
+        self.artifacts = {artifact['name']: artifact for artifact in artifacts}
+        self.agents = {
+            artifact['name']: create_customer_support_agent(model_for(artifact), artifact['prompt'])
+            for artifact in artifacts
+        }
+        self.default_agent = artifacts[0]['name']
+        self.max_concurrency = max_concurrency
+        self._semaphore: Optional[asyncio.Semaphore] = None
+
+    async def answer(self, message: str, agent_name: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Answers one message with the named agent.
+
+        Args:
+            message (str): The customer's message.
+            agent_name (str, optional): Artifact name. Defaults to the first artifact.
+
+        Returns:
+            Dict[str, Any]: The response, agent name and artifact content hash.
+
+        Raises:
+            KeyError: If no artifact with that name is loaded.
+        """
+        name = agent_name or self.default_agent
+        agent = self.agents[name]
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        async with self._semaphore:
+            response = await agent.run(message)
+        return {"response": response.output, "agent": name, "content_hash": self.artifacts[name]['content_hash']}
+
+    async def route(self, method: str, path: str, body: bytes) -> Tuple[int, Dict[str, Any]]:
+        """Dispatches one request and returns the status code and JSON payload."""
+        if method == "GET" and path == "/health":
+            agents = {name: artifact['content_hash'] for name, artifact in self.artifacts.items()}
+            return 200, {"status": "ok", "agents": agents}
+
+        if method != "POST" or path != "/chat":
+            return 404, {"error": f"No route for {method} {path}"}
+
+        try:
+            request = json.loads(body or b"{}")
+            message = request["message"]
+        except (ValueError, KeyError, TypeError):
+            return 400, {"error": "Expected a JSON body with a 'message' field"}
+
+        name = request.get("agent") or self.default_agent
+        if name not in self.agents:
+            return 404, {"error": f"Unknown agent: {name}"}
+
+        try:
+            return 200, await self.answer(message, name)
+        except Exception as e:
+            return 500, {"error": str(e)}
+
+    async def handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        """Reads one HTTP request from the connection, answers it and closes the connection."""
+        try:
+            request_line = (await reader.readline()).decode("latin-1").split()
+            headers = {}
+            while (line := await reader.readline()) not in (b"\r\n", b"\n", b""):
+                key, _, value = line.decode("latin-1").partition(":")
+                headers[key.strip().lower()] = value.strip()
+
+            length = int(headers.get("content-length", 0))
+            if len(request_line) < 2:
+                status, payload = 400, {"error": "Malformed request line"}
+            elif length > MAX_BODY_BYTES:
+                status, payload = 413, {"error": "Request body too large"}
+            else:
+                body = await reader.readexactly(length) if length else b""
+                status, payload = await self.route(request_line[0], request_line[1], body)
+
+            data = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+            writer.write(
+                f"HTTP/1.1 {status} {STATUS_TEXT[status]}\r\n"
+                f"Content-Type: application/json\r\nContent-Length: {len(data)}\r\nConnection: close\r\n\r\n"
+                .encode("latin-1") + data
+            )
+            await writer.drain()
+        except (ConnectionError, asyncio.IncompleteReadError, ValueError):
+            pass
+        finally:
+            writer.close()
+
+    async def start(self, host: str = "127.0.0.1", port: int = 8000) -> asyncio.Server:
+        """Starts listening and returns the asyncio server."""
+        return await asyncio.start_server(self.handle_connection, host, port)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--artifact", action="append", required=True, metavar="[NAME=]FILE",
+                        help="Agent artifact to serve; repeatable. NAME overrides the name stored in the artifact.")
+    parser.add_argument("--host", default="127.0.0.1", help="Interface to listen on")
+    parser.add_argument("--port", type=int, default=8000, help="Port to listen on")
+    parser.add_argument("--concurrency", type=int, default=32, help="Maximum number of concurrent model calls")
+    parser.add_argument("--stub", action="store_true", help="Use an offline stub model instead of Groq")
+    parser.add_argument("--stub-latency", type=float, default=0.0, help="Seconds the stub model waits per call")
+    args = parser.parse_args()
+
+    paths, artifacts = [], []
+    for spec in args.artifact:
+        name, separator, path = spec.partition("=")
+        if not separator:
+            name, path = "", spec
+        name, path = name.strip(), path.strip()
+        if not path:
+            parser.error(f"--artifact must be FILE or NAME=FILE, got {spec!r}")
+        artifact = load_artifact(Path(path))
+        if name:
+            artifact = dict(artifact, name=name)
+        paths.append(path)
+        artifacts.append(artifact)
+
+    names = [artifact['name'] for artifact in artifacts]
+    duplicates = sorted({name for name in names if names.count(name) > 1})
+    if duplicates:
+        parser.error(f"Several artifacts are named {', '.join(duplicates)}; name them with --artifact NAME=FILE")
+
+    if args.stub:
+        from stub_model import create_stub_model
+        stub = create_stub_model(latency=args.stub_latency)
+        model_for = lambda artifact: stub
+    else:
+        from model_setup import MODEL_PROVIDER, initialize_environment, create_model
+        unsupported = [path for path, artifact in zip(paths, artifacts)
+                       if artifact['model']['provider'] != MODEL_PROVIDER]
+        if unsupported:
+            parser.error(f"Only {MODEL_PROVIDER} models can be served: {', '.join(unsupported)}")
+        groq_key, _ = initialize_environment()
+        if not groq_key:
+            parser.error("GROQ_KEY is not set; export it or add it to .env, or use --stub")
+        model_for = lambda artifact: create_model(groq_key, artifact['model']['name'])
+
+    server = AgentServer(artifacts, model_for, args.concurrency)
+
+    async def run() -> None:
+        listener = await server.start(args.host, args.port)
+        print(f"Serving {', '.join(server.agents)} on http://{args.host}:{args.port}")
+        async with listener:
+            await listener.serve_forever()
+
+    try:
+        asyncio.run(run())
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
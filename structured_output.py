@@ -0,0 +1,221 @@
+import json
+import re
+import threading
+from typing import Any, Dict, Type, TypeVar
+
+from pydantic import BaseModel, ValidationError
+
+T = TypeVar("T", bound=BaseModel)
+
+_PYTHON_LITERALS = {"True": "true", "False": "false", "None": "null"}
+
+
+class OutputStats:
+    """
+    Counts how one agent's structured outputs were parsed.
+
+    `clean` outputs parsed as-is, `repaired` outputs needed the local JSON
+    repair, and `failed` outputs triggered a retry round-trip to the model.
+    """
+
+    def __init__(self):
+        self.clean = 0
+        self.repaired = 0
+        self.failed = 0
+        self._lock = threading.Lock()
+
+    def record(self, outcome: str) -> None:
+        with self._lock:
+            setattr(self, outcome, getattr(self, outcome) + 1)
+
+    @property
+    def attempts(self) -> int:
+        return self.clean + self.repaired + self.failed
+
+    @property
+    def retry_rate(self) -> float:
+        return self.failed / self.attempts if self.attempts else 0.0
+
+    @property
+    def repair_rate(self) -> float:
+        return self.repaired / self.attempts if self.attempts else 0.0
+
+
+# Shared by every session in the process, so the rates cover all users of the app
+output_stats: Dict[str, OutputStats] = {}
+_stats_lock = threading.Lock()
+
+
+def get_output_stats(agent_name: str) -> OutputStats:
+    """Returns the process-wide parsing stats for an agent, creating them on first use."""
+    with _stats_lock:
+        return output_stats.setdefault(agent_name, OutputStats())
+
+
+def _extract_candidate(text: str) -> str:
+    """Strips reasoning blocks, markdown fences and surrounding prose from a model reply."""
+    text = re.sub(r"<think>.*?</think>", "", text, flags=re.DOTALL)
+    fenced = re.search(r"```(?:json)?\s*(.*?)(?:```|$)", text, flags=re.DOTALL)
+    if fenced and "{" in fenced.group(1):
+        text = fenced.group(1)
+    start = text.find("{")
+    if start == -1:
+        raise ValueError("No JSON object found in output")
+    return text[start:]
+
+
+def _normalize(candidate: str) -> str:
+    """
+    Rewrites near-JSON into JSON in a single pass.
+
+    Handles single-quoted strings, raw newlines and tabs inside strings,
+    Python literals, trailing commas, text after the closing brace, and
+    output truncated between values. Output truncated inside a value is
+    rejected: closing a cut-off string would accept a cut-off prompt, and
+    closing after a bare number would turn a score of 85 cut off at "8"
+    into 8. Truncated output is only closed after a complete string, a
+    closed bracket, an opening bracket, or a comma.
+    """
+    out = []
+    stack = []
+    quote = None
+    i = 0
+
+    def strip_trailing_comma():
+        while out and out[-1].isspace():
+            out.pop()
+        if out and out[-1] == ",":
+            out.pop()
+
+    while i < len(candidate):
+        c = candidate[i]
+        if quote:
+            if c == "\\" and i + 1 < len(candidate):
+                nxt = candidate[i + 1]
+                out.append("'" if quote == "'" and nxt == "'" else c + nxt)
+                i += 2
+                continue
+            if c == quote:
+                out.append('"')
+                quote = None
+            elif c == '"':
+                out.append('\\"')
+            elif c in "\n\r\t":
+                out.append({"\n": "\\n", "\r": "\\r", "\t": "\\t"}[c])
+            else:
+                out.append(c)
+        elif c in "\"'":
+            quote = c
+            out.append('"')
+        elif c in "{[":
+            stack.append("}" if c == "{" else "]")
+            out.append(c)
+        elif c in "}]":
+            strip_trailing_comma()
+            if stack and stack[-1] == c:
+                stack.pop()
+            out.append(c)
+            if not stack:
+                break
+        else:
+            literal = next((word for word in _PYTHON_LITERALS if candidate.startswith(word, i)), None)
+            if literal:
+                out.append(_PYTHON_LITERALS[literal])
+                i += len(literal)
+                continue
+            out.append(c)
+        i += 1
+
+    if quote:
+        raise ValueError("Output ends inside a string")
+    if stack:
+        last = "".join(out).rstrip()[-1:]
+        if last not in ('"', ",", "[", "{", "]", "}"):
+            raise ValueError("Output ends inside a value")
+    while stack:
+        strip_trailing_comma()
+        out.append(stack.pop())
+    return "".join(out)
+
+
+def repair_json(text: str) -> Any:
+    """
+    Parses a model reply that should be JSON but may be malformed.
+
+    Args:
+        text (str): The raw model output.
+
+    Returns:
+        Any: The parsed JSON value.
+
+    Raises:
+        ValueError: If the output cannot be repaired.
+    """
+    candidate = _extract_candidate(text)
+    try:
+        return json.loads(candidate)
+    except ValueError:
+        return json.loads(_normalize(candidate))
+
+
+def parse_structured_output(text: str, output_cls: Type[T], stats: OutputStats) -> T:
+    """
+    Parses and validates a model reply, repairing malformed JSON locally.
+
+    Args:
+        text (str): The raw model output.
+        output_cls (Type[T]): The pydantic model to validate against.
+        stats (OutputStats): Stats to record the outcome in.
+
+    Returns:
+        T: The validated output.
+
+    Raises:
+        ModelRetry: If the output cannot be repaired or does not match the schema,
+                    so the agent asks the model again.
+    """
+    from pydantic_ai import ModelRetry
+
+    try:
+        data = json.loads(text)
+        outcome = "clean"
+    except ValueError:
+        try:
+            data = repair_json(text)
+            outcome = "repaired"
+        except ValueError:
+            stats.record("failed")
+            raise ModelRetry("Output was not valid JSON. Return only the JSON object described in your instructions.")
+
+    try:
+        output = output_cls.model_validate(data)
+    except ValidationError as e:
+        stats.record("failed")
+        raise ModelRetry(f"Output did not match the required schema: {e.errors(include_url=False, include_input=False)}")
+
+    stats.record(outcome)
+    return output
+
+
+def create_output_parser(output_cls: Type[T], agent_name: str):
+    """
+    Creates a text output type for an agent that parses its JSON reply locally.
+
+    The model replies in plain text as the `/no_think` prompts instruct, and
+    only unrecoverable replies cost a retry round-trip.
+
+    Args:
+        output_cls (Type[T]): The pydantic model to validate against.
+        agent_name (str): Name the parsing stats are recorded under.
+
+    Returns:
+        TextOutput: The output type to pass to `Agent(output_type=...)`.
+    """
+    from pydantic_ai import TextOutput
+
+    stats = get_output_stats(agent_name)
+
+    def parse(text: str) -> output_cls:
+        return parse_structured_output(text, output_cls, stats)
+
+    return TextOutput(parse)
@@ -0,0 +1,57 @@
+import asyncio
+import hashlib
+import json
+import random
+
+from pydantic_ai.messages import ModelResponse, SystemPromptPart, TextPart
+from pydantic_ai.models.function import AgentInfo, FunctionModel
+
+from prompts import customer_support_prompt
+
+
+def create_stub_model(latency: float = 0.0, seed: int = 0) -> FunctionModel:
+    """
+    Creates an offline stand-in for the Groq model that can serve every agent.
+
+    Support agents get a short reply tagged with a hash of their system prompt,
+    so different prompt versions give different replies. The evaluator gets
+    seeded random scores, the rewriter gets numbered revisions of the default
+    prompt, and the pairwise judge gets seeded random verdicts.
+
+    Args:
+        latency (float, optional): Seconds to wait per call. Defaults to 0.0.
+        seed (int, optional): Seed for scores and verdicts. Defaults to 0.
+
+    Returns:
+        FunctionModel: The stub model.
+    """
+    rng = random.Random(seed)
+    revisions = iter(range(1, 1_000_000))
+
+    async def respond(messages, info: AgentInfo) -> ModelResponse:
+        await asyncio.sleep(latency)
+        system_prompt = "".join(
+            part.content for message in messages for part in message.parts
+            if isinstance(part, SystemPromptPart)
+        )
+
+        # The evaluator, rewriter and judge reply with JSON text, recognized by their prompts
+        if '"improvement_instr"' in system_prompt:
+            output = {
+                "improvement_instr": [
+                    "Ask one clarifying question at a time",
+                    "Acknowledge the customer's feelings before asking for details",
+                    "Summarize the issue once enough information is gathered",
+                ],
+                "score": rng.randint(50, 90),
+            }
+        elif '"new_prompt"' in system_prompt:
+            output = {"new_prompt": f"{customer_support_prompt}\n# revision {next(revisions)}", "improvements": ["Clarified flow"]}
+        elif '"winner"' in system_prompt:
+            output = {"winner": rng.choice(["A", "B", "tie"]), "reason": "Stub verdict"}
+        else:
+            version = hashlib.sha256(system_prompt.encode("utf-8")).hexdigest()[:6]
+            return ModelResponse(parts=[TextPart(f"[{version}] Thanks for reaching out. Could you tell me more?")])
+        return ModelResponse(parts=[TextPart(json.dumps(output))])
+
+    return FunctionModel(respond)
@@ -1,7 +1,8 @@
 import streamlit as st
+from scoring import create_score_matrix
 
 
-def initialize_state(num_cycles, queries_per_cycle, custom_criteria):
+def initialize_state(num_cycles, queries_per_cycle, custom_criteria, incremental_evaluation=False):
     """Initialize the interactive training state in session state."""
     st.session_state.interactive_training_state = {
         'active': True,
@@ -9,8 +10,11 @@ def initialize_state(num_cycles, queries_per_cycle, custom_criteria):
         'total_cycles': num_cycles,
         'queries_per_cycle': queries_per_cycle,
         'custom_criteria': custom_criteria,
+        'incremental_evaluation': incremental_evaluation,
+        'incremental_evaluator': None,
         'current_prompt': st.session_state.initial_prompt,
         'scores': [],
+        'score_matrix': create_score_matrix(custom_criteria),
         'all_interactions': [],
         'all_improvements': [],
         'current_cycle_queries': [],
@@ -50,13 +54,18 @@ def render_parameter_page():
             value=2,
             help="Number of queries to process in each cycle"
         )
+        incremental_evaluation = st.checkbox(
+            "Evaluate each query in the background",
+            value=False,
+            help="Score every interaction as soon as the agent responds, so the end-of-cycle evaluation only merges the results"
+        )
         
     # Custom criteria
     with param_col2:
         st.subheader("Evaluation Criteria")
         custom_criteria = st.text_area(
             "Additional evaluation criteria (optional)",
-            placeholder="Enter custom evaluation criteria...",
+            placeholder="One criterion per line, e.g.\nBrevity: Answers fit in three sentences",
             height=100,
             help="""Specify additional criteria for evaluating agent performance, currently it evaluate on:\n
                 1. Relevance – Did the assistant directly address the customer's needs and questions?
@@ -65,12 +74,13 @@ def render_parameter_page():
                 4. Tone – Was the assistant's tone professional, polite, and helpful?
                 5. Empathy – Did the assistant show understanding of the customer's situation and respond with appropriate empathy?
                 6. Efficiency – Did the assistant avoid unnecessary responses and guide the conversation toward resolution quickly?
-                7. Adherence to Policy – Did the assistant follow company/customer support policies and guidelines?
+                7. Adherence to Policy – Did the assistant follow company/customer support policies and guidelines?\n
+                Write one criterion per line as "Name: description". Lines without a colon or dash continue the previous description.
                 """
         )
         
         # Confirmation button
         if st.button("Confirm Changes", type="primary"):
-            initialize_state(num_cycles, queries_per_cycle, custom_criteria)
+            initialize_state(num_cycles, queries_per_cycle, custom_criteria, incremental_evaluation)
             st.success("✅ Parameters confirmed! Training configuration updated.")
             st.rerun()
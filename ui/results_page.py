@@ -1,4 +1,10 @@
+import json
 import streamlit as st
+from functions import initialize_environment, create_model
+from prompt_comparison import compare_prompts, ResponseCache
+from prompts import customer_support_prompt
+from structured_output import output_stats
+from agent_artifact import build_artifact
 
 
 def render_results_page():
@@ -17,12 +23,20 @@ def render_results_page():
     if st.session_state.training_results:
         results = st.session_state.training_results
         
+        score_matrix = results.get('score_matrix')
+        has_criteria = score_matrix is not None and score_matrix.num_cycles > 0
+        
         # Score progression and summary
         col1, col2 = st.columns(2)
         
         with col1:
             st.subheader("📈 Score Progression")
-            if results['scores']:
+            if has_criteria:
+                st.line_chart({
+                    "Evaluator score": score_matrix.overall.tolist(),
+                    "Weighted criteria score": score_matrix.weighted_scores().tolist(),
+                })
+            elif results['scores']:
                 st.line_chart(results['scores'])
                 
         with col2:
@@ -37,16 +51,41 @@ def render_results_page():
                 st.write("**Best Score:**", max(results['scores']))
                 improvement = results['scores'][-1] - results['scores'][0] if len(results['scores']) > 1 else 0
                 st.write("**Improvement:**", improvement)
+            
+            # Structured output parsing; the stats are process-wide, not per session
+            for agent_name, stats in output_stats.items():
+                if stats.attempts:
+                    st.write(f"**{agent_name.title()} Retry Rate (all sessions):** {stats.retry_rate:.0%} "
+                             f"({stats.repaired} repaired locally, {stats.failed} retried)")
+        
+        # Per-criterion breakdown
+        if has_criteria:
+            render_criteria_breakdown(score_matrix)
         
         # Final prompt
         st.subheader("🔄 Final Optimized Prompt")
         st.code(results['final_prompt'], language="text", wrap_lines=True)
         
+        # Export for serving
+        custom_criteria = st.session_state.get('interactive_training_state', {}).get('custom_criteria', "")
+        artifact = build_artifact(results, custom_criteria)
+        st.download_button(
+            "📦 Export Trained Agent",
+            data=json.dumps(artifact, ensure_ascii=False, indent=2, allow_nan=False),
+            file_name="trained_agent.json",
+            mime="application/json",
+            help=f"Bundles the prompt, model, criteria and scores for `python serve.py --artifact trained_agent.json`. Content hash: {artifact['content_hash'][:12]}"
+        )
+        
         # Improvements made
         st.subheader("✨ Improvements Made")
         for i, improvement in enumerate(results['improvements'], 1):
             st.write(f"{i}. {improvement}")
         
+        # A/B check against the starting prompts
+        with st.expander("🆚 Compare Against Earlier Prompts"):
+            render_prompt_comparison(results)
+        
         # Interaction history
         with st.expander("📝 Interaction History"):
             for i, (user_input, agent_output) in enumerate(results['interactions'], 1):
@@ -57,4 +96,71 @@ def render_results_page():
     else:
         st.info("No training results available yet. Please complete the training process first.")
         
-    return st.session_state.training_results is not None
\ No newline at end of file
+    return st.session_state.training_results is not None
+
+
+def render_criteria_breakdown(score_matrix):
+    """Render per-criterion trends, variance and regressions from the score matrix."""
+    st.subheader("🧭 Criteria Breakdown")
+    st.line_chart(score_matrix.criterion_history())
+    
+    trend = score_matrix.trend()
+    variance = score_matrix.variance()[-1]
+    latest = score_matrix.criterion_means()[-1]
+    st.dataframe(
+        {
+            "Criterion": score_matrix.criteria,
+            "Latest Mean": [round(v, 1) for v in latest.tolist()],
+            "Trend / Cycle": [round(v, 2) for v in trend.tolist()],
+            "Variance": [round(v, 1) for v in variance.tolist()],
+        },
+        hide_index=True,
+    )
+    
+    for cycle, criterion, delta in score_matrix.regressions():
+        st.warning(f"⚠️ {criterion} dropped by {abs(delta):.1f} points in cycle {cycle}")
+
+
+
+def render_prompt_comparison(results):
+    """Render an A/B comparison of the final prompt against the initial and default prompts."""
+    prompts = {"trained": results['final_prompt']}
+    initial_prompt = st.session_state.get('initial_prompt')
+    if initial_prompt and initial_prompt not in prompts.values():
+        prompts["initial"] = initial_prompt
+    if customer_support_prompt not in prompts.values():
+        prompts["default"] = customer_support_prompt
+    
+    if len(prompts) < 2:
+        st.info("The trained prompt is identical to the starting prompt, so there is nothing to compare.")
+        return
+    
+    queries_text = st.text_area(
+        "Test queries (one per line)",
+        value="\n".join(query for query, _ in results['interactions']),
+        height=150,
+        help="Every prompt version answers the same queries, and each pair of answers is judged by the evaluator."
+    )
+    queries = [line.strip() for line in queries_text.splitlines() if line.strip()]
+    
+    if st.button("▶️ Run Comparison", disabled=not queries):
+        try:
+            with st.spinner("Comparing prompt versions..."):
+                groq_key, _ = initialize_environment()
+                model = create_model(groq_key)
+                custom_criteria = st.session_state.get('interactive_training_state', {}).get('custom_criteria', "")
+                summary = compare_prompts(model, prompts, queries, custom_criteria, cache=ResponseCache())
+            
+            st.dataframe(
+                {
+                    "Version": list(summary['versions']),
+                    "Wins": [counts['wins'] for counts in summary['versions'].values()],
+                    "Losses": [counts['losses'] for counts in summary['versions'].values()],
+                    "Ties": [counts['ties'] for counts in summary['versions'].values()],
+                    "Win Rate": [f"{counts['win_rate']:.0%}" for counts in summary['versions'].values()],
+                    "95% CI": [f"{counts['ci_low']:.0%} – {counts['ci_high']:.0%}" for counts in summary['versions'].values()],
+                },
+                hide_index=True,
+            )
+        except Exception as e:
+            st.error(f"❌ Error during comparison: {e}")
@@ -1,9 +1,11 @@
+import time
 import streamlit as st
 from functions import (
     initialize_environment,
     create_model,
     create_customer_support_agent
 )
+from semantic_cache import SemanticCache
 
 
 def render_test_agent_page():
@@ -24,6 +26,28 @@ def render_test_agent_page():
         
         st.subheader("🤖 Chat with your trained agent")
         
+        # Optional near-duplicate cache in front of the agent
+        use_cache = st.checkbox(
+            "Cache near-duplicate messages",
+            value=False,
+            help="Reuse the agent's answer for messages that are nearly identical to an earlier one. The cache is cleared whenever the trained prompt changes."
+        )
+        if use_cache:
+            threshold = st.slider("Similarity threshold", min_value=0.5, max_value=1.0, value=0.65, step=0.05,
+                                  help="Share of content words two messages must have in common. Messages with different numbers or negations never match.")
+            if 'semantic_cache' not in st.session_state:
+                st.session_state.semantic_cache = SemanticCache(threshold=threshold)
+            cache = st.session_state.semantic_cache
+            cache.threshold = threshold
+            cache.ensure_prompt(final_prompt)
+            
+            cache_col1, cache_col2, cache_col3 = st.columns(3)
+            cache_col1.metric("Cache Hit Rate", f"{cache.hit_rate:.0%}")
+            cache_col2.metric("Latency Saved", f"{cache.latency_saved:.1f}s")
+            cache_col3.metric("Cached Responses", len(cache))
+        else:
+            cache = None
+        
         # Initialize chat history
         if 'chat_history' not in st.session_state:
             st.session_state.chat_history = []
@@ -44,15 +68,22 @@ def render_test_agent_page():
             
             # Get agent response
             try:
-                groq_key, _ = initialize_environment()
-                model = create_model(groq_key)
-                agent = create_customer_support_agent(model, final_prompt)
+                agent_response = cache.get(prompt) if cache is not None else None
                 
                 with st.chat_message("assistant"):
-                    with st.spinner("Thinking..."):
-                        response = agent.run_sync(prompt)
-                        agent_response = response.output
+                    if agent_response is not None:
                         st.write(agent_response)
+                        st.caption("⚡ Served from cache")
+                    else:
+                        agent = get_test_agent(final_prompt)
+                        
+                        with st.spinner("Thinking..."):
+                            start = time.perf_counter()
+                            response = agent.run_sync(prompt)
+                            agent_response = response.output
+                            if cache is not None:
+                                cache.put(prompt, agent_response, time.perf_counter() - start)
+                            st.write(agent_response)
                 
                 # Add agent response to chat history
                 st.session_state.chat_history.append({"role": "assistant", "content": agent_response})
@@ -67,4 +98,15 @@ def render_test_agent_page():
     else:
         st.info("No trained agent available yet. Please complete the training process first to test your agent.")
         
-    return st.session_state.training_results is not None
\ No newline at end of file
+    return st.session_state.training_results is not None
+
+
+def get_test_agent(final_prompt):
+    """Return the chat agent for the trained prompt, building it only when the prompt changes."""
+    cached = st.session_state.get('test_agent')
+    if cached is None or cached[0] != final_prompt:
+        groq_key, _ = initialize_environment()
+        model = create_model(groq_key)
+        cached = (final_prompt, create_customer_support_agent(model, final_prompt))
+        st.session_state.test_agent = cached
+    return cached[1]
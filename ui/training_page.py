@@ -8,6 +8,8 @@ from functions import (
     create_customer_support_agent,
     initialize_interaction_log
 )
+from scoring import create_score_matrix
+from incremental_evaluation import IncrementalEvaluator
 
 
 def render_training_page():
@@ -113,6 +115,13 @@ def process_single_query(query):
         
         # Log the interaction for evaluation
         log_interaction_to_file(query, agent_response)
+        
+        # Start scoring it in the background so the cycle end only merges results
+        if state.get('incremental_evaluation'):
+            if state.get('incremental_evaluator') is None:
+                evaluator_agent, _ = create_agents(model, state['custom_criteria'])
+                state['incremental_evaluator'] = IncrementalEvaluator(evaluator_agent)
+            state['incremental_evaluator'].submit(query, agent_response)
         st.rerun()
         
     except Exception as e:
@@ -155,13 +164,29 @@ def complete_cycle_and_evaluate():
             if log_file.exists():
                 log_content = log_file.read_text()
                 
-                # Evaluate performance
-                evaluation = evaluator_agent.run_sync(log_content).output
+                # Evaluate performance, merging background results when available
+                evaluation = None
+                incremental_evaluator = state.get('incremental_evaluator')
+                if incremental_evaluator is not None:
+                    evaluation = incremental_evaluator.merge()
+                    state['incremental_evaluator'] = None
+                    if incremental_evaluator.failed:
+                        st.warning(f"⚠️ {incremental_evaluator.failed} of {len(incremental_evaluator)} background "
+                                   "evaluations failed. Evaluating the whole cycle instead.")
+                if evaluation is None:
+                    evaluation = evaluator_agent.run_sync(log_content).output
+                
+                # Find the weakest criteria so the rewriter can target them
+                if 'score_matrix' not in state:
+                    state['score_matrix'] = create_score_matrix(state['custom_criteria'])
+                num_interactions = len(state['current_cycle_queries'])
+                weakest = state['score_matrix'].weakest_criteria(evaluation, num_interactions)
                 
                 # Rewrite prompt
-                rewrite_response = rewriter_agent.run_sync(
-                    f"old_prompt: {state['current_prompt']}\n\nimprovement_instructions: {evaluation.improvement_instr}"
-                )
+                rewrite_input = f"old_prompt: {state['current_prompt']}\n\nimprovement_instructions: {evaluation.improvement_instr}"
+                if weakest:
+                    rewrite_input += f"\n\nweakest_criteria: {weakest}"
+                rewrite_response = rewriter_agent.run_sync(rewrite_input)
                 
                 # Store results
                 new_score = evaluation.score
@@ -180,6 +205,8 @@ def complete_cycle_and_evaluate():
                     state['scores'].pop()  # Remove the bad score
                 else:
                     state['current_prompt'] = new_prompt
+                    # Only accepted cycles are recorded, matching state['scores']
+                    state['score_matrix'].add_cycle(evaluation, num_interactions)
                     st.success(f"🎉 Score: {new_score}. Prompt updated!")
                 
                 # Save current cycle results for display
@@ -217,6 +244,7 @@ def complete_interactive_training():
     final_results = {
         'final_prompt': state['current_prompt'],
         'scores': state['scores'],
+        'score_matrix': state.get('score_matrix'),
         'interactions': state['all_interactions'],
         'improvements': state['all_improvements'],
         'num_cycles': len(state['scores'])  # Actual cycles completed